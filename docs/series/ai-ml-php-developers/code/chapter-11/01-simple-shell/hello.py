@@ -7,16 +7,28 @@ This demonstrates the fundamental pattern for PHP-Python integration.
 import sys
 import json
 
+try:
+    # orjson is a much faster drop-in for json.loads/json.dumps (optional)
+    import orjson
+
+    def json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    json_loads = orjson.loads
+except ImportError:
+    json_dumps = json.dumps
+    json_loads = json.loads
+
 
 def main():
     # Python can receive data via command-line arguments
     if len(sys.argv) < 2:
-        print(json.dumps({'error': 'No data provided'}))
+        print(json_dumps({'error': 'No data provided'}))
         sys.exit(1)
     
     # Parse JSON input from PHP
     try:
-        input_data = json.loads(sys.argv[1])
+        input_data = json_loads(sys.argv[1])
         name = input_data.get('name', 'World')
         
         # Process the data (trivial example)
@@ -27,9 +39,9 @@ def main():
         }
         
         # Output JSON for PHP to parse
-        print(json.dumps(result))
+        print(json_dumps(result))
     except json.JSONDecodeError as e:
-        print(json.dumps({'error': f'Invalid JSON: {str(e)}'}))
+        print(json_dumps({'error': f'Invalid JSON: {str(e)}'}))
         sys.exit(1)
 
 
@@ -14,19 +14,43 @@ declare(strict_types=1);
 function callPythonProcessor(array $data): array
 {
     $json = json_encode($data);
-    $escaped = escapeshellarg($json);
-    $output = shell_exec("python3 " . __DIR__ . "/process.py {$escaped}");
 
-    if ($output === null) {
+    // Send the JSON on stdin rather than as a shell argument: no ARG_MAX
+    // limit for large batches and no shell escaping needed
+    $descriptors = [
+        0 => ['pipe', 'r'],  // stdin
+        1 => ['pipe', 'w'],  // stdout
+        2 => ['pipe', 'w'],  // stderr
+    ];
+
+    $process = proc_open(['python3', __DIR__ . '/process.py'], $descriptors, $pipes);
+
+    if (!is_resource($process)) {
         throw new RuntimeException('Python script execution failed');
     }
 
+    fwrite($pipes[0], $json);
+    fclose($pipes[0]);
+
+    $output = stream_get_contents($pipes[1]);
+    $errors = stream_get_contents($pipes[2]);
+    fclose($pipes[1]);
+    fclose($pipes[2]);
+    $exitCode = proc_close($process);
+
     $result = json_decode($output, true);
 
+    // process.py reports its own errors as JSON on stdout
     if (isset($result['error'])) {
         throw new RuntimeException("Python error: {$result['error']}");
     }
 
+    if ($exitCode !== 0 || !is_array($result)) {
+        throw new RuntimeException(
+            "Python script failed (exit code {$exitCode}): " . trim($errors ?: $output)
+        );
+    }
+
     return $result;
 }
 
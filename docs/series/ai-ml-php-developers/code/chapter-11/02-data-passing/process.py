@@ -2,14 +2,66 @@
 Example of processing complex structured data in Python.
 
 In a real ML scenario, this might extract features, normalize values, etc.
+
+Usage:
+    echo '{"id": 1, "purchases": [{"amount": 50}]}' | python3 process.py
+    python3 process.py '{"id": 1, "purchases": [{"amount": 50}]}'
 """
 
 import sys
 import json
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
+
+try:
+    # orjson is a much faster drop-in for json.loads/json.dumps (optional)
+    import orjson
+
+    def json_dumps(obj, indent: bool = False) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None).decode()
+
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj, indent: bool = False) -> str:
+        return json.dumps(obj, indent=2 if indent else None)
 
+    json_loads = json.loads
 
-def process_user_data(user: Dict[str, Any]) -> Dict[str, Any]:
+# Below this many users, JIT dispatch and array packing cost more than they save
+NUMBA_MIN_BATCH = 1000
+
+
+@lru_cache(maxsize=None)
+def load_sum_purchases():
+    """
+    Build the Numba batch kernel on first use (None if Numba is not installed).
+
+    Imported lazily so single users and small batches never pay for
+    importing NumPy and Numba.
+    """
+    try:
+        # Numba compiles the batch aggregation to native code (optional)
+        import numpy as np
+        from numba import njit, prange
+    except ImportError:
+        return None
+
+    @njit(parallel=True, cache=True)
+    def sum_purchases(amounts, offsets):
+        """Total purchase amount per user; user i owns amounts[offsets[i]:offsets[i + 1]]."""
+        n_users = offsets.shape[0] - 1
+        totals = np.empty(n_users, dtype=np.float64)
+        for i in prange(n_users):
+            total = 0.0
+            for j in range(offsets[i], offsets[i + 1]):
+                total += amounts[j]
+            totals[i] = total
+        return totals
+
+    return sum_purchases
+
+
+def process_user_data(user: Dict[str, Any], total_spent: Optional[float] = None) -> Dict[str, Any]:
     """
     Example of processing complex structured data.
     In a real ML scenario, this might extract features, normalize values, etc.
@@ -19,9 +71,12 @@ def process_user_data(user: Dict[str, Any]) -> Dict[str, Any]:
     age = user.get('age', 0)
     purchases = user.get('purchases', [])
     
-    # Perform calculations
-    total_spent = sum(p.get('amount', 0) for p in purchases)
-    avg_purchase = total_spent / len(purchases) if purchases else 0
+    # Perform calculations (the batch path passes in a precomputed total).
+    # Always a float, so both paths return the same JSON types.
+    if total_spent is None:
+        total_spent = sum(p.get('amount', 0) for p in purchases)
+    total_spent = float(total_spent)
+    avg_purchase = total_spent / len(purchases) if purchases else 0.0
     
     # Classify user segment (simple business logic)
     if total_spent > 1000 and len(purchases) > 10:
@@ -44,6 +99,35 @@ def process_user_data(user: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+def process_users_batch(users: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Process a batch of users.
+    
+    For large batches, purchase amounts are flattened into NumPy arrays and
+    summed by the Numba kernel instead of a Python loop per user.
+    """
+    sum_purchases = load_sum_purchases() if len(users) >= NUMBA_MIN_BATCH else None
+    if sum_purchases is None:
+        return [process_user_data(user) for user in users]
+    
+    import numpy as np
+    
+    purchase_lists = [user.get('purchases', []) for user in users]
+    amounts = np.fromiter(
+        (p.get('amount', 0) for purchases in purchase_lists for p in purchases),
+        dtype=np.float64
+    )
+    offsets = np.zeros(len(users) + 1, dtype=np.int64)
+    np.cumsum([len(purchases) for purchases in purchase_lists], out=offsets[1:])
+    
+    totals = sum_purchases(amounts, offsets)
+    
+    return [
+        process_user_data(user, total)
+        for user, total in zip(users, totals.tolist())
+    ]
+
+
 def generate_recommendations(segment: str) -> list:
     """Generate product recommendations based on segment."""
     recommendations = {
@@ -56,11 +140,17 @@ def generate_recommendations(segment: str) -> list:
 
 def main():
     try:
-        # Read input from PHP
-        if len(sys.argv) < 2:
+        # Read input from PHP: JSON on stdin (preferred, no argv size limit
+        # or shell escaping), or as the first command-line argument
+        if len(sys.argv) >= 2:
+            raw_input = sys.argv[1]
+        else:
+            raw_input = sys.stdin.buffer.read()
+        
+        if not raw_input.strip():
             raise ValueError('No input data provided')
         
-        input_data = json.loads(sys.argv[1])
+        input_data = json_loads(raw_input)
         
         # Process single user or batch of users
         if isinstance(input_data, dict):
@@ -68,19 +158,19 @@ def main():
             result = process_user_data(input_data)
         elif isinstance(input_data, list):
             # Batch of users
-            result = [process_user_data(user) for user in input_data]
+            result = process_users_batch(input_data)
         else:
             raise ValueError('Input must be object or array')
         
         # Return result to PHP
-        print(json.dumps(result, indent=2))
+        print(json_dumps(result, indent=True))
         
     except Exception as e:
         error_result = {
             'error': str(e),
             'type': type(e).__name__
         }
-        print(json.dumps(error_result))
+        print(json_dumps(error_result))
         sys.exit(1)
 
 
@@ -14,6 +14,22 @@ import json
 from pathlib import Path
 import joblib
 import numpy as np
+from scipy.special import softmax
+
+try:
+    # orjson is a much faster drop-in for json.loads/json.dumps (optional)
+    import orjson
+
+    def json_dumps(obj) -> str:
+        # Class labels from scikit-learn are NumPy strings, so allow non-str keys
+        return orjson.dumps(
+            obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ).decode()
+
+    json_loads = orjson.loads
+except ImportError:
+    json_dumps = json.dumps
+    json_loads = json.loads
 
 
 def load_model(model_dir: str = 'models'):
@@ -27,23 +43,41 @@ def load_model(model_dir: str = 'models'):
             "Run train_model.py first."
         )
     
-    classifier = joblib.load(model_path)
-    vectorizer = joblib.load(vectorizer_path)
+    classifier = joblib.load(model_path, mmap_mode='r')
+    vectorizer = joblib.load(vectorizer_path, mmap_mode='r')
     
     return classifier, vectorizer
 
 
+def predict_probabilities(classifier, text_vec):
+    """
+    Return class probabilities for each row of text_vec.
+    
+    LinearSVC (which exercise1-train.py may save) has no predict_proba, so its
+    decision scores are turned into probabilities with a softmax (a sigmoid
+    for two classes) instead of an expensive calibration step.
+    """
+    if hasattr(classifier, 'predict_proba'):
+        return classifier.predict_proba(text_vec)
+    
+    scores = classifier.decision_function(text_vec)
+    if scores.ndim == 1:
+        # Binary models return one score per row for the positive class
+        scores = np.column_stack([np.zeros_like(scores), scores])
+    
+    return softmax(scores, axis=1)
+
+
 def predict_sentiment(text: str, classifier, vectorizer):
     """Predict sentiment for given text."""
     # Transform text to TF-IDF features
     text_vec = vectorizer.transform([text])
     
-    # Predict sentiment
-    prediction = classifier.predict(text_vec)[0]
-    
-    # Get probability scores for all classes
-    probabilities = classifier.predict_proba(text_vec)[0]
+    # Get probability scores for all classes; the predicted sentiment is
+    # simply the most probable class, so no separate predict() call is needed
+    probabilities = predict_probabilities(classifier, text_vec)[0]
     classes = classifier.classes_
+    prediction = classes[probabilities.argmax()]
     
     # Build confidence scores
     confidence_scores = {
@@ -65,7 +99,7 @@ def main():
         if len(sys.argv) < 2:
             raise ValueError('No input data provided')
         
-        input_data = json.loads(sys.argv[1])
+        input_data = json_loads(sys.argv[1])
         text = input_data.get('text', '')
         
         if not text:
@@ -78,14 +112,14 @@ def main():
         result = predict_sentiment(text, classifier, vectorizer)
         
         # Return result
-        print(json.dumps(result))
+        print(json_dumps(result))
         
     except Exception as e:
         error_result = {
             'error': str(e),
             'type': type(e).__name__
         }
-        print(json.dumps(error_result))
+        print(json_dumps(error_result))
         sys.exit(1)
 
 
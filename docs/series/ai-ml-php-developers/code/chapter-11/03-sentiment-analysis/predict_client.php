@@ -0,0 +1,124 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * Sentiment predictions via the long-running Python daemon.
+ *
+ * analyze.php starts a new Python process (and reloads the model) for every
+ * prediction. This client instead talks to predict_daemon.py over a Unix
+ * domain socket, so the model is loaded once and each request only pays
+ * for the inference itself.
+ *
+ * Start the daemon first:
+ *   python3 predict_daemon.py
+ *
+ * Protocol: 4-byte big-endian length prefix + JSON payload, both ways.
+ */
+
+class SentimentDaemonClient
+{
+    /** Largest request predict_daemon.py accepts (MAX_REQUEST_SIZE) */
+    private const MAX_REQUEST_SIZE = 1024 * 1024;
+
+    /** @var resource */
+    private $socket;
+
+    public function __construct(
+        string $socketPath = '/tmp/sentiment.sock',
+        float $timeout = 5.0
+    ) {
+        $socket = @stream_socket_client("unix://{$socketPath}", $errno, $errstr, $timeout);
+
+        if ($socket === false) {
+            throw new RuntimeException(
+                "Failed to connect to {$socketPath}: {$errstr}. " .
+                "Start the daemon: python3 predict_daemon.py"
+            );
+        }
+
+        stream_set_timeout($socket, (int) ceil($timeout));
+        $this->socket = $socket;
+    }
+
+    public function __destruct()
+    {
+        fclose($this->socket);
+    }
+
+    /**
+     * Predict sentiment for given text.
+     */
+    public function predict(string $text): array
+    {
+        if (empty(trim($text))) {
+            throw new InvalidArgumentException('Text cannot be empty');
+        }
+
+        $start = microtime(true);
+
+        $payload = json_encode(['text' => $text]);
+
+        if (strlen($payload) > self::MAX_REQUEST_SIZE) {
+            throw new InvalidArgumentException('Text is too large for the daemon (max 1 MiB)');
+        }
+
+        fwrite($this->socket, pack('N', strlen($payload)) . $payload);
+
+        $length = unpack('N', $this->readExact(4))[1];
+        $result = json_decode($this->readExact($length), true);
+
+        if (isset($result['error'])) {
+            throw new RuntimeException("Prediction error: {$result['error']}");
+        }
+
+        $duration = microtime(true) - $start;
+        $result['prediction_time'] = round($duration * 1000, 2);  // milliseconds
+
+        return $result;
+    }
+
+    private function readExact(int $length): string
+    {
+        $data = '';
+
+        while (strlen($data) < $length) {
+            $chunk = fread($this->socket, $length - strlen($data));
+
+            if ($chunk === false || $chunk === '') {
+                throw new RuntimeException('Connection to prediction daemon closed');
+            }
+
+            $data .= $chunk;
+        }
+
+        return $data;
+    }
+}
+
+// Example usage
+try {
+    $client = new SentimentDaemonClient();
+
+    echo "=== Predict Sentiments (persistent daemon) ===\n\n";
+
+    $testReviews = [
+        "This is absolutely wonderful! I love it so much!",
+        "Terrible product. Complete waste of money.",
+        "It's okay. Nothing special but it works.",
+    ];
+
+    foreach ($testReviews as $review) {
+        $result = $client->predict($review);
+
+        echo "{$result['sentiment']} ";
+        echo "(" . round($result['confidence'] * 100, 1) . "% confident, ";
+        echo "{$result['prediction_time']}ms)\n";
+        echo "   \"{$review}\"\n\n";
+    }
+
+    echo "✅ Compare the timings with analyze.php, which starts Python per prediction.\n";
+} catch (Exception $e) {
+    echo "❌ Error: {$e->getMessage()}\n";
+    exit(1);
+}
@@ -0,0 +1,127 @@
+"""
+Long-running sentiment prediction server on a Unix domain socket.
+
+Calling predict.py from PHP starts a new Python interpreter and reloads the
+model for every request, which usually costs far more than the prediction
+itself. This daemon loads the model once and then answers requests over a
+local socket, so each prediction only pays for the inference.
+
+Protocol (both directions):
+    4-byte big-endian payload length, followed by a JSON payload.
+    Request:  {"text": "..."}
+    Response: same JSON as predict.py
+
+Usage:
+    python3 predict_daemon.py [socket_path]
+
+Then from PHP:
+    php predict_client.php
+"""
+
+import os
+import socketserver
+import struct
+import sys
+from pathlib import Path
+
+from predict import load_model, predict_sentiment, json_dumps, json_loads
+
+SOCKET_PATH = '/tmp/sentiment.sock'
+MODEL_DIR = Path(__file__).parent / 'models'
+
+# Largest request accepted; the length prefix is untrusted, so without a
+# cap one bad header could make the daemon buffer up to 4 GiB
+MAX_REQUEST_SIZE = 1024 * 1024
+
+# Loaded once at startup and shared by all connections
+classifier = None
+vectorizer = None
+
+
+def recv_exact(sock, size: int):
+    """Read exactly `size` bytes, or return None if the client disconnected."""
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            return None
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+def handle_request(payload: bytes) -> dict:
+    """Run one prediction request and build the response."""
+    try:
+        input_data = json_loads(payload)
+        text = input_data.get('text', '')
+
+        if not text:
+            raise ValueError('Text field is required')
+
+        return predict_sentiment(text, classifier, vectorizer)
+
+    except Exception as e:
+        return {
+            'error': str(e),
+            'type': type(e).__name__
+        }
+
+
+class PredictionHandler(socketserver.BaseRequestHandler):
+    """Serve length-prefixed requests until the client closes the connection."""
+
+    def send(self, response: dict):
+        body = json_dumps(response).encode()
+        self.request.sendall(struct.pack('>I', len(body)) + body)
+
+    def handle(self):
+        while True:
+            header = recv_exact(self.request, 4)
+            if header is None:
+                return
+
+            (length,) = struct.unpack('>I', header)
+            if length > MAX_REQUEST_SIZE:
+                # The oversized payload is never read, so the stream can't be
+                # resynchronised: report the error and close the connection
+                self.send({
+                    'error': f'Request too large: {length} bytes (max {MAX_REQUEST_SIZE})',
+                    'type': 'ValueError'
+                })
+                return
+
+            payload = recv_exact(self.request, length)
+            if payload is None:
+                return
+
+            self.send(handle_request(payload))
+
+
+class PredictionServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def main():
+    global classifier, vectorizer
+
+    socket_path = sys.argv[1] if len(sys.argv) > 1 else SOCKET_PATH
+
+    classifier, vectorizer = load_model(MODEL_DIR)
+    print("✅ Model loaded")
+
+    # Remove a stale socket left behind by a previous run
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    with PredictionServer(socket_path, PredictionHandler) as server:
+        print(f"👂 Listening on unix://{socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n🛑 Server stopped")
+        finally:
+            os.unlink(socket_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,19 +6,47 @@ This approach is more scalable than shell execution:
 - Can handle concurrent requests
 - Standard HTTP protocol
 - Easy to deploy separately and scale horizontally
+
+Usage:
+    # Development (single process)
+    python3 flask_server.py
+
+    # Production: --preload loads the models once in the master process,
+    # so the forked workers share the same model memory pages
+    gunicorn --preload -w 4 -k gthread --threads 4 -b 127.0.0.1:5000 flask_server:app
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+from functools import lru_cache
 from pathlib import Path
 import joblib
 import sys
 import os
 
+try:
+    # orjson serializes responses much faster than Flask's jsonify (optional)
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add parent directory to path to import model loading logic
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '03-sentiment-analysis'))
+from predict import predict_probabilities
 
 app = Flask(__name__)
 
+
+def json_response(payload, status: int = 200):
+    """Serialize a response body, bypassing jsonify when orjson is available."""
+    if orjson is None:
+        return jsonify(payload), status
+
+    body = orjson.dumps(
+        payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    )
+    return Response(body, status=status, mimetype='application/json')
+
+
 # Load model at startup (not per request!)
 MODEL_DIR = '../03-sentiment-analysis/models'
 classifier = None
@@ -38,15 +66,36 @@ def load_models():
             "Run training first: cd ../03-sentiment-analysis && php analyze.php"
         )
     
-    classifier = joblib.load(model_path)
-    vectorizer = joblib.load(vectorizer_path)
+    classifier = joblib.load(model_path, mmap_mode='r')
+    vectorizer = joblib.load(vectorizer_path, mmap_mode='r')
+    predict_one.cache_clear()
+    
+    # Warm up: the first prediction triggers lazy imports and sparse code
+    # paths, so pay that cost now instead of on the first real request
+    predict_probabilities(classifier, vectorizer.transform(['warmup']))
     print("✅ Models loaded successfully")
 
 
+@lru_cache(maxsize=10_000)
+def predict_one(text: str) -> tuple:
+    """
+    Predict sentiment for a single text.
+    
+    Results are cached by text, so repeated inputs (the same review or
+    tweet sent again) skip vectorization and inference entirely.
+    Returns (sentiment, confidence, per-class probabilities).
+    """
+    text_vec = vectorizer.transform([text])
+    probabilities = predict_probabilities(classifier, text_vec)[0]
+    prediction = classifier.classes_[probabilities.argmax()]
+    
+    return str(prediction), float(probabilities.max()), tuple(map(float, probabilities))
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
-    return jsonify({
+    return json_response({
         'status': 'healthy',
         'model_loaded': classifier is not None
     })
@@ -60,33 +109,31 @@ def predict():
         data = request.get_json()
         
         if not data or 'text' not in data:
-            return jsonify({'error': 'Missing "text" field'}), 400
+            return json_response({'error': 'Missing "text" field'}, 400)
         
         text = data['text']
         
         if not text or not text.strip():
-            return jsonify({'error': 'Text cannot be empty'}), 400
+            return json_response({'error': 'Text cannot be empty'}, 400)
         
-        # Transform and predict
-        text_vec = vectorizer.transform([text])
-        prediction = classifier.predict(text_vec)[0]
-        probabilities = classifier.predict_proba(text_vec)[0]
+        # Transform and predict (cached for repeated texts)
+        prediction, confidence, probabilities = predict_one(text)
         
         # Build response
         confidence_scores = {
-            cls: float(prob)
+            str(cls): prob
             for cls, prob in zip(classifier.classes_, probabilities)
         }
         
-        return jsonify({
+        return json_response({
             'text': text,
             'sentiment': prediction,
-            'confidence': float(probabilities.max()),
+            'confidence': confidence,
             'all_scores': confidence_scores
         })
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 @app.route('/predict/batch', methods=['POST'])
@@ -96,37 +143,52 @@ def predict_batch():
         data = request.get_json()
         
         if not data or 'texts' not in data:
-            return jsonify({'error': 'Missing "texts" array'}), 400
+            return json_response({'error': 'Missing "texts" array'}, 400)
         
         texts = data['texts']
         
         if not isinstance(texts, list):
-            return jsonify({'error': '"texts" must be an array'}), 400
+            return json_response({'error': '"texts" must be an array'}, 400)
         
-        # Transform all texts at once (efficient)
-        texts_vec = vectorizer.transform(texts)
-        predictions = classifier.predict(texts_vec)
-        probabilities = classifier.predict_proba(texts_vec)
+        if not all(isinstance(text, str) for text in texts):
+            return json_response({'error': '"texts" must contain only strings'}, 400)
         
-        # Build results
-        results = []
-        for text, pred, probs in zip(texts, predictions, probabilities):
-            results.append({
+        # Deduplicate: each distinct text is tokenized and predicted once,
+        # and inverse[i] is the row of texts[i] in the unique batch
+        unique_index = {}
+        inverse = [unique_index.setdefault(text, len(unique_index)) for text in texts]
+        
+        # Transform all distinct texts at once (efficient)
+        texts_vec = vectorizer.transform(list(unique_index))
+        probabilities = predict_probabilities(classifier, texts_vec)
+        
+        # Scatter the per-unique-text results back to every input position
+        predictions = classifier.classes_[probabilities.argmax(axis=1)][inverse].tolist()
+        confidences = probabilities.max(axis=1)[inverse].tolist()
+        
+        # Build results in the original order, duplicates included
+        results = [
+            {
                 'text': text,
                 'sentiment': pred,
-                'confidence': float(probs.max())
-            })
+                'confidence': confidence
+            }
+            for text, pred, confidence in zip(texts, predictions, confidences)
+        ]
         
-        return jsonify({'predictions': results})
+        return json_response({'predictions': results})
         
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 
 if __name__ == '__main__':
     print("Starting Flask ML API...")
     load_models()
-    app.run(host='127.0.0.1', port=5000, debug=True)
+    app.run(host='127.0.0.1', port=5000, debug=False)
+else:
+    # Imported by a WSGI server such as gunicorn: load models at import time
+    load_models()
 
 
 
@@ -13,6 +13,9 @@ declare(strict_types=1);
  * 
  * This example uses Redis as the message queue.
  * Production alternatives: RabbitMQ, AWS SQS, Google Pub/Sub
+ *
+ * Payloads are encoded with MessagePack (ext-msgpack), which is smaller
+ * and faster to parse than JSON. The Python worker uses the same format.
  */
 
 class AsyncMLQueue
@@ -29,6 +32,12 @@ class AsyncMLQueue
             );
         }
 
+        if (!extension_loaded('msgpack')) {
+            throw new RuntimeException(
+                'MessagePack extension required. Install: pecl install msgpack'
+            );
+        }
+
         $this->redis = new Redis();
         if (!$this->redis->connect($host, $port)) {
             throw new RuntimeException("Failed to connect to Redis at {$host}:{$port}");
@@ -51,15 +60,20 @@ class AsyncMLQueue
             'status' => 'pending'
         ];
 
-        // Add task to queue
-        $this->redis->lPush('ml_tasks', json_encode($task));
-
-        // Store task metadata for status checking
-        $this->redis->setex(
-            "task:{$taskId}",
-            3600,  // 1 hour TTL
-            json_encode($task)
-        );
+        // Store task status as a hash, so workers can update single fields
+        // instead of re-serializing the whole task. It is written before the
+        // task is queued (in one MULTI), so a fast worker's 'completed' can
+        // never be overwritten by 'pending'.
+        $this->redis->multi()
+            ->hMSet("task:{$taskId}", [
+                'id' => $taskId,
+                'type' => $taskType,
+                'status' => 'pending',
+                'submitted_at' => $task['submitted_at'],
+            ])
+            ->expire("task:{$taskId}", 3600)  // 1 hour TTL
+            ->lPush('ml_tasks', msgpack_pack($task))
+            ->exec();
 
         return $taskId;
     }
@@ -69,8 +83,20 @@ class AsyncMLQueue
      */
     public function getTaskStatus(string $taskId): ?array
     {
-        $data = $this->redis->get("task:{$taskId}");
-        return $data ? json_decode($data, true) : null;
+        $status = $this->redis->hGetAll("task:{$taskId}");
+
+        if (!$status) {
+            return null;
+        }
+
+        // Hash values come back as strings
+        foreach (['submitted_at', 'started_at', 'completed_at'] as $field) {
+            if (isset($status[$field])) {
+                $status[$field] = (int) $status[$field];
+            }
+        }
+
+        return $status;
     }
 
     /**
@@ -79,7 +105,7 @@ class AsyncMLQueue
     public function getTaskResult(string $taskId): ?array
     {
         $data = $this->redis->get("result:{$taskId}");
-        return $data ? json_decode($data, true) : null;
+        return $data ? msgpack_unpack($data) : null;
     }
 
     /**
@@ -100,14 +126,15 @@ class AsyncMLQueue
                 continue;  // No task, keep waiting
             }
 
-            $task = json_decode($taskData[1], true);
+            $task = msgpack_unpack($taskData[1]);
             echo "Processing task {$task['id']} ({$task['type']})...\n";
 
             try {
                 // Update status to processing
-                $task['status'] = 'processing';
-                $task['started_at'] = time();
-                $this->redis->setex("task:{$task['id']}", 3600, json_encode($task));
+                $this->redis->hMSet("task:{$task['id']}", [
+                    'status' => 'processing',
+                    'started_at' => time(),
+                ]);
 
                 // Process task (call Python script, do ML work)
                 $result = $this->executeMLTask($task);
@@ -116,13 +143,15 @@ class AsyncMLQueue
                 $this->redis->setex(
                     "result:{$task['id']}",
                     3600,
-                    json_encode($result)
+                    msgpack_pack($result)
                 );
 
                 // Update task status
-                $task['status'] = 'completed';
-                $task['completed_at'] = time();
-                $this->redis->setex("task:{$task['id']}", 3600, json_encode($task));
+                $this->redis->hMSet("task:{$task['id']}", [
+                    'status' => 'completed',
+                    'completed_at' => time(),
+                ]);
+                $this->redis->expire("task:{$task['id']}", 3600);
 
                 // Callback if URL provided
                 if ($task['callback_url']) {
@@ -133,9 +162,11 @@ class AsyncMLQueue
             } catch (Exception $e) {
                 echo "❌ Task {$task['id']} failed: {$e->getMessage()}\n";
 
-                $task['status'] = 'failed';
-                $task['error'] = $e->getMessage();
-                $this->redis->setex("task:{$task['id']}", 3600, json_encode($task));
+                $this->redis->hMSet("task:{$task['id']}", [
+                    'status' => 'failed',
+                    'error' => $e->getMessage(),
+                ]);
+                $this->redis->expire("task:{$task['id']}", 3600);
             }
         }
     }
@@ -206,12 +237,12 @@ try {
 } catch (Exception $e) {
     echo "❌ Error: {$e->getMessage()}\n";
 
-    if (!extension_loaded('redis')) {
-        echo "\nRedis extension not installed. This is normal for demo.\n";
+    if (!extension_loaded('redis') || !extension_loaded('msgpack')) {
+        echo "\nRedis/MessagePack extensions not installed. This is normal for demo.\n";
         echo "For production use, install Redis:\n";
         echo "  brew install redis  # macOS\n";
         echo "  apt install redis-server  # Ubuntu\n";
-        echo "  pecl install redis  # PHP extension\n";
+        echo "  pecl install redis msgpack  # PHP extensions\n";
     }
 }
 
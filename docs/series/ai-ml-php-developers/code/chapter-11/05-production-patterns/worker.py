@@ -2,68 +2,185 @@
 Python worker that processes tasks from Redis queue.
 
 This runs continuously in the background:
-1. Polls Redis queue for new tasks
-2. Executes ML tasks (prediction, training, etc.)
+1. Moves new tasks (up to BATCH_SIZE at a time) from the Redis queue to
+   a processing list, so tasks survive a worker crash
+2. Executes ML tasks (prediction, training, etc.), batching predictions
 3. Stores results back in Redis
 4. Sends callbacks if provided
 
 Usage:
     python3 worker.py
 
-Run multiple workers for parallel processing:
-    python3 worker.py &
-    python3 worker.py &
-    python3 worker.py &
+Each worker runs CONSUMERS asyncio consumers that overlap Redis I/O with
+prediction. Run multiple workers (each with its own WORKER_ID) to use more
+CPU cores:
+    WORKER_ID=1 python3 worker.py &
+    WORKER_ID=2 python3 worker.py &
+    WORKER_ID=3 python3 worker.py &
+
+On start, a worker re-queues the tasks left in flight by any worker that
+is no longer running (including its own previous run). A second worker
+cannot start with a WORKER_ID that is already in use.
+
+Requires Redis 6.2+ (LMOVE/BLMOVE).
 """
 
+import asyncio
 import redis
-import json
+import redis.asyncio as aioredis
+import msgpack
+import os
+import socket
 import time
 import sys
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Maximum number of queued tasks taken (and predicted) per loop iteration
+BATCH_SIZE = 32
+
+# Number of concurrent queue consumers (asyncio tasks) per worker process
+CONSUMERS = 4
+
+# Tasks being worked on are parked on a per-worker list until they finish.
+# The default id (host + PID) is unique per process, so unnamed workers
+# never share a list; lists left by crashed workers are re-queued by the
+# next worker to start (see requeue_unfinished()).
+PROCESSING_PREFIX = 'ml_processing:'
+WORKER_ID = os.environ.get('WORKER_ID', f"{socket.gethostname()}:{os.getpid()}")
+PROCESSING_QUEUE = f"{PROCESSING_PREFIX}{WORKER_ID}"
+
+# A worker holds this key (refreshed every WORKER_LOCK_TTL / 3 seconds)
+# while running, so two processes never use the same processing list and
+# a list whose lock has expired is known to be abandoned
+WORKER_LOCK_PREFIX = 'ml_worker:'
+WORKER_LOCK = f"{WORKER_LOCK_PREFIX}{WORKER_ID}"
+WORKER_LOCK_TTL = 30
+
+# Payloads that are not a valid task are moved here for inspection instead
+# of being retried forever
+DEAD_LETTER_QUEUE = 'ml_dead_letter'
+
+# In-process LRU cache of text -> (sentiment, confidence); repeat texts
+# (the same review or tweet queued again) skip vectorizing and inference
+PREDICTION_CACHE_SIZE = 10_000
+PREDICTION_CACHE = OrderedDict()
+
 # Add sentiment analysis to path
 sys.path.insert(0, str(Path(__file__).parent.parent / '03-sentiment-analysis'))
 
+SENTIMENT_MODEL = None
+SENTIMENT_VECTORIZER = None
+
 try:
     import joblib
-    SENTIMENT_MODEL = None
-    SENTIMENT_VECTORIZER = None
+    from predict import predict_probabilities
     
     # Try to load sentiment model
     model_path = Path(__file__).parent.parent / '03-sentiment-analysis' / 'models' / 'sentiment_model.pkl'
     if model_path.exists():
-        SENTIMENT_MODEL = joblib.load(model_path)
+        # Memory-map the model arrays read-only so every worker process
+        # started on this machine shares the same physical pages
+        SENTIMENT_MODEL = joblib.load(model_path, mmap_mode='r')
         vectorizer_path = model_path.parent / 'vectorizer.pkl'
-        SENTIMENT_VECTORIZER = joblib.load(vectorizer_path)
+        SENTIMENT_VECTORIZER = joblib.load(vectorizer_path, mmap_mode='r')
+        
+        # Warm up: the first prediction triggers lazy imports and sparse code
+        # paths, so pay that cost now instead of on the first queued task
+        predict_probabilities(SENTIMENT_MODEL, SENTIMENT_VECTORIZER.transform(['warmup']))
         print("✅ Sentiment model loaded")
 except ImportError:
-    print("⚠️  joblib not installed. Sentiment tasks will be simulated.")
+    print("⚠️  joblib/scikit-learn not installed. Sentiment tasks will be simulated.")
 
 
-def process_sentiment_analysis(data):
-    """Process sentiment analysis task."""
-    text = data.get('text', '')
+def pack(obj) -> bytes:
+    """Serialize a queue payload with MessagePack (smaller and faster than JSON)."""
+    return msgpack.packb(obj, use_bin_type=True)
+
+
+def unpack(payload: bytes):
+    """Deserialize a MessagePack queue payload."""
+    return msgpack.unpackb(payload, raw=False)
+
+
+def decode_tasks(payloads):
+    """
+    Decode and validate each payload on its own.
+    
+    Returns (payload, task) pairs for the valid tasks and
+    (payload, task_id, error) triples for the rest, so one malformed
+    payload never takes the rest of its batch down with it.
+    """
+    valid, rejected = [], []
+    for payload in payloads:
+        try:
+            task = unpack(payload)
+        except Exception as e:
+            rejected.append((payload, None, f"Invalid task payload: {e!r}"))
+            continue
+        
+        if not isinstance(task, dict) or 'id' not in task or 'type' not in task:
+            task_id = task.get('id') if isinstance(task, dict) else None
+            rejected.append((payload, task_id, "Invalid task: 'id' and 'type' are required"))
+            continue
+        
+        valid.append((payload, task))
+    
+    return valid, rejected
+
+
+def process_sentiment_batch(items):
+    """Process many sentiment analysis tasks with one vectorize/predict call."""
+    texts = [data.get('text', '') for data in items]
     
     if SENTIMENT_MODEL and SENTIMENT_VECTORIZER:
-        # Real prediction
-        text_vec = SENTIMENT_VECTORIZER.transform([text])
-        prediction = SENTIMENT_MODEL.predict(text_vec)[0]
-        probabilities = SENTIMENT_MODEL.predict_proba(text_vec)[0]
+        # Only texts not seen recently need a real prediction
+        misses = [
+            text for text in dict.fromkeys(texts) if text not in PREDICTION_CACHE
+        ]
+        
+        if misses:
+            # Real prediction: transform and predict all misses at once so
+            # scikit-learn's per-call overhead is paid once, not once per text
+            texts_vec = SENTIMENT_VECTORIZER.transform(misses)
+            probabilities = predict_probabilities(SENTIMENT_MODEL, texts_vec)
+            predictions = SENTIMENT_MODEL.classes_[probabilities.argmax(axis=1)]
+            
+            for text, prediction, probs in zip(misses, predictions, probabilities):
+                PREDICTION_CACHE[text] = (str(prediction), float(probs.max()))
         
-        return {
-            'text': text,
-            'sentiment': prediction,
-            'confidence': float(probabilities.max())
-        }
+        results = []
+        for text in texts:
+            PREDICTION_CACHE.move_to_end(text)
+            prediction, confidence = PREDICTION_CACHE[text]
+            results.append({
+                'text': text,
+                'sentiment': prediction,
+                'confidence': confidence
+            })
+        
+        # Evict the least recently used predictions
+        while len(PREDICTION_CACHE) > PREDICTION_CACHE_SIZE:
+            PREDICTION_CACHE.popitem(last=False)
+        
+        return results
     else:
         # Simulated prediction
-        return {
-            'text': text,
-            'sentiment': 'positive',
-            'confidence': 0.85,
-            'note': 'Simulated (model not loaded)'
-        }
+        return [
+            {
+                'text': text,
+                'sentiment': 'positive',
+                'confidence': 0.85,
+                'note': 'Simulated (model not loaded)'
+            }
+            for text in texts
+        ]
+
+
+def process_sentiment_analysis(data):
+    """Process sentiment analysis task."""
+    return process_sentiment_batch([data])[0]
 
 
 def process_task(task):
@@ -81,67 +198,217 @@ def process_task(task):
         raise ValueError(f"Unknown task type: {task_type}")
 
 
-def main():
-    """Main worker loop."""
-    print("🔧 Starting ML Worker...")
+def process_batch(tasks):
+    """
+    Process a batch of tasks.
     
-    # Connect to Redis
-    try:
-        r = redis.Redis(host='127.0.0.1', port=6379, decode_responses=True)
-        r.ping()
-        print("✅ Connected to Redis")
-    except redis.ConnectionError:
-        print("❌ Failed to connect to Redis")
-        print("   Start Redis: brew services start redis  # macOS")
-        return
+    Sentiment tasks are predicted together; everything else goes through
+    process_task() one by one. If the batched prediction fails, its tasks
+    are retried one by one so only the bad task fails. Returns a
+    (result, error) pair per task, in the same order as the input.
+    """
+    outcomes = [None] * len(tasks)
+    
+    sentiment_indices = [
+        i for i, task in enumerate(tasks) if task['type'] == 'sentiment_analysis'
+    ]
+    if sentiment_indices:
+        try:
+            results = process_sentiment_batch(
+                [tasks[i]['data'] for i in sentiment_indices]
+            )
+            for i, result in zip(sentiment_indices, results):
+                outcomes[i] = (result, None)
+        except Exception:
+            pass  # Left as None: retried one by one below
     
-    print("👂 Listening for tasks on queue 'ml_tasks'...\n")
+    for i, task in enumerate(tasks):
+        if outcomes[i] is None:
+            try:
+                outcomes[i] = (process_task(task), None)
+            except Exception as e:
+                outcomes[i] = (None, e)
+    
+    return outcomes
+
+
+async def fetch_batch(r, size: int = BATCH_SIZE):
+    """
+    Move up to `size` of the oldest tasks onto this worker's processing list.
+    
+    Each LMOVE atomically takes one task off the queue and records it as
+    in flight, so a crash never loses a task; all moves share one round-trip.
+    Returns the raw payloads (needed to acknowledge them).
+    """
+    # PHP pushes with LPUSH, so the oldest tasks are on the right
+    pipe = r.pipeline(transaction=False)
+    for _ in range(size):
+        pipe.lmove('ml_tasks', PROCESSING_QUEUE, src='RIGHT', dest='LEFT')
+    payloads = [payload for payload in await pipe.execute() if payload is not None]
+    
+    if not payloads:
+        # Queue is empty: block briefly for the next task instead of spinning
+        payload = await r.blmove(
+            'ml_tasks', PROCESSING_QUEUE, timeout=1, src='RIGHT', dest='LEFT'
+        )
+        payloads = [payload] if payload is not None else []
+    
+    return payloads
+
+
+async def claim_worker_id(r) -> bool:
+    """Take the WORKER_ID lock; False if another live worker holds it."""
+    return bool(await r.set(WORKER_LOCK, os.getpid(), nx=True, ex=WORKER_LOCK_TTL))
+
+
+async def keep_worker_id(r):
+    """Refresh the WORKER_ID lock for as long as the worker runs."""
+    while True:
+        await asyncio.sleep(WORKER_LOCK_TTL / 3)
+        await r.expire(WORKER_LOCK, WORKER_LOCK_TTL)
+
+
+async def requeue_unfinished(r):
+    """
+    Put tasks left in flight by workers that are no longer running back on
+    the queue.
+    
+    Covers this worker's own list (a restart with the same WORKER_ID) and
+    every other processing list whose worker lock has expired, such as one
+    left by a crashed worker with the default host + PID id.
+    """
+    count = 0
+    async for key in r.scan_iter(match=f"{PROCESSING_PREFIX}*"):
+        worker_id = key.decode()[len(PROCESSING_PREFIX):]
+        if worker_id != WORKER_ID and await r.exists(f"{WORKER_LOCK_PREFIX}{worker_id}"):
+            continue  # Still owned by a running worker
+        
+        # Each LMOVE is atomic, so workers starting together never
+        # re-queue the same task twice
+        while await r.lmove(key, 'ml_tasks', src='LEFT', dest='RIGHT') is not None:
+            count += 1
+    
+    if count:
+        print(f"♻️  Re-queued {count} unfinished task(s)")
+
+
+async def dead_letter(r, rejected):
+    """Acknowledge invalid payloads by moving them to the dead-letter list."""
+    pipe = r.pipeline(transaction=False)
+    for payload, task_id, error in rejected:
+        if task_id is not None:
+            pipe.hset(f"task:{task_id}", mapping={'status': 'failed', 'error': error})
+            pipe.expire(f"task:{task_id}", 3600)
+        pipe.lpush(DEAD_LETTER_QUEUE, payload)
+        pipe.lrem(PROCESSING_QUEUE, 1, payload)
+        print(f"❌ {error} (moved to {DEAD_LETTER_QUEUE})")
+    await pipe.execute()
+
+
+async def consume(r, executor):
+    """
+    Consumer loop: fetch a batch, process it, store the results.
+    
+    Several consumers run concurrently, so while one waits on Redis another
+    can be running predictions in the executor.
+    """
+    loop = asyncio.get_running_loop()
     
     while True:
         try:
-            # Blocking pop with 1 second timeout
-            task_data = r.brpop('ml_tasks', timeout=1)
-            
-            if not task_data:
-                continue  # No task, keep waiting
-            
-            task = json.loads(task_data[1])
-            task_id = task['id']
+            valid, rejected = decode_tasks(await fetch_batch(r))
             
-            print(f"📥 Received task {task_id} ({task['type']})")
+            if rejected:
+                await dead_letter(r, rejected)
             
-            # Update status
-            task['status'] = 'processing'
-            task['started_at'] = int(time.time())
-            r.setex(f"task:{task_id}", 3600, json.dumps(task))
+            if not valid:
+                continue  # No task, keep waiting
             
-            # Process task
-            result = process_task(task)
+            payloads, tasks = zip(*valid)
             
-            # Store result
-            r.setex(f"result:{task_id}", 3600, json.dumps(result))
+            # Tasks on the processing list are in flight; no separate
+            # "processing" status write is needed
+            for task in tasks:
+                print(f"📥 Received task {task['id']} ({task['type']})")
             
-            # Update task status
-            task['status'] = 'completed'
-            task['completed_at'] = int(time.time())
-            r.setex(f"task:{task_id}", 3600, json.dumps(task))
+            # Process tasks off the event loop
+            outcomes = await loop.run_in_executor(executor, process_batch, tasks)
             
-            print(f"✅ Completed task {task_id}\n")
+            # Store results and final task status (a Redis hash, so only the
+            # changed fields are sent), then acknowledge the tasks by removing
+            # them from the processing list, all in one round-trip
+            completed_at = int(time.time())
+            pipe = r.pipeline(transaction=False)
+            for payload, task, (result, error) in zip(payloads, tasks, outcomes):
+                task_id = task['id']
+                if error is None:
+                    pipe.setex(f"result:{task_id}", 3600, pack(result))
+                    pipe.hset(f"task:{task_id}", mapping={
+                        'status': 'completed',
+                        'completed_at': completed_at
+                    })
+                    print(f"✅ Completed task {task_id}")
+                else:
+                    pipe.hset(f"task:{task_id}", mapping={
+                        'status': 'failed',
+                        'error': str(error)
+                    })
+                    print(f"❌ Error processing task {task_id}: {error}")
+                pipe.expire(f"task:{task_id}", 3600)
+                pipe.lrem(PROCESSING_QUEUE, 1, payload)
+            await pipe.execute()
+            print()
             
-        except KeyboardInterrupt:
-            print("\n🛑 Worker stopped")
-            break
         except Exception as e:
-            print(f"❌ Error processing task: {e}\n")
-            if 'task_id' in locals():
-                task['status'] = 'failed'
-                task['error'] = str(e)
-                r.setex(f"task:{task_id}", 3600, json.dumps(task))
+            print(f"❌ Error processing batch: {e}\n")
 
 
-if __name__ == '__main__':
-    main()
+async def run_worker():
+    """Connect to Redis and run the consumers until interrupted."""
+    print("🔧 Starting ML Worker...")
+    
+    # Connect to Redis
+    r = aioredis.Redis(host='127.0.0.1', port=6379, decode_responses=False)
+    try:
+        await r.ping()
+        print("✅ Connected to Redis")
+    except redis.ConnectionError:
+        print("❌ Failed to connect to Redis")
+        print("   Start Redis: brew services start redis  # macOS")
+        return
+    
+    # Re-queueing is only safe when no other process is using this list
+    if not await claim_worker_id(r):
+        print(f"❌ WORKER_ID '{WORKER_ID}' is already used by a running worker")
+        print("   Give each worker its own id: WORKER_ID=2 python3 worker.py")
+        print(f"   (after a crash the id frees up within {WORKER_LOCK_TTL}s)")
+        await r.aclose()
+        return
+    
+    await requeue_unfinished(r)
+    
+    print(f"👂 Listening for tasks on queue 'ml_tasks' ({CONSUMERS} consumers)...\n")
+    
+    # A single inference thread: predictions (and the prediction cache) are
+    # never used concurrently, while the consumers overlap Redis I/O with it
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        try:
+            await asyncio.gather(
+                keep_worker_id(r),
+                *(consume(r, executor) for _ in range(CONSUMERS))
+            )
+        finally:
+            await r.delete(WORKER_LOCK)
+            await r.aclose()
 
 
+def main():
+    """Main worker entry point."""
+    try:
+        asyncio.run(run_worker())
+    except KeyboardInterrupt:
+        print("\n🛑 Worker stopped")
 
 
+if __name__ == '__main__':
+    main()
@@ -14,6 +14,50 @@ For real production use, you'd use scikit-learn or similar ML library.
 import sys
 import json
 
+try:
+    # orjson is a much faster drop-in for json.loads/json.dumps (optional)
+    import orjson
+
+    def json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    json_loads = orjson.loads
+except ImportError:
+    json_dumps = json.dumps
+    json_loads = json.loads
+
+
+POSITIVE_WORDS = ['amazing', 'excellent', 'great', 'love', 'recommend',
+                  'fantastic', 'wonderful', 'perfect', 'best', 'awesome']
+NEGATIVE_WORDS = ['terrible', 'awful', 'hate', 'worst', 'disappointing',
+                  'horrible', 'bad', 'poor', 'waste', 'useless']
+
+try:
+    # pyahocorasick finds every keyword in a single pass over the text,
+    # instead of one substring scan per keyword (optional)
+    import ahocorasick
+
+    KEYWORDS = ahocorasick.Automaton()
+    for word in POSITIVE_WORDS:
+        KEYWORDS.add_word(word, ('positive', word))
+    for word in NEGATIVE_WORDS:
+        KEYWORDS.add_word(word, ('negative', word))
+    KEYWORDS.make_automaton()
+except ImportError:
+    KEYWORDS = None
+
+
+def count_keywords(text_lower):
+    """Count how many distinct positive and negative keywords appear in the text."""
+    if KEYWORDS is None:
+        positive_count = sum(1 for word in POSITIVE_WORDS if word in text_lower)
+        negative_count = sum(1 for word in NEGATIVE_WORDS if word in text_lower)
+        return positive_count, negative_count
+    
+    found = {match for _, match in KEYWORDS.iter(text_lower)}
+    positive_count = sum(1 for label, _ in found if label == 'positive')
+    return positive_count, len(found) - positive_count
+
 
 def analyze_sentiment(text):
     """
@@ -22,16 +66,10 @@ def analyze_sentiment(text):
     In production, use scikit-learn, TensorFlow, or similar ML library.
     This is just for demonstration purposes.
     """
-    positive_words = ['amazing', 'excellent', 'great', 'love', 'recommend', 
-                      'fantastic', 'wonderful', 'perfect', 'best', 'awesome']
-    negative_words = ['terrible', 'awful', 'hate', 'worst', 'disappointing',
-                      'horrible', 'bad', 'poor', 'waste', 'useless']
-    
     text_lower = text.lower()
     
     # Count positive and negative words
-    positive_count = sum(1 for word in positive_words if word in text_lower)
-    negative_count = sum(1 for word in negative_words if word in text_lower)
+    positive_count, negative_count = count_keywords(text_lower)
     
     # Determine sentiment
     if positive_count > negative_count:
@@ -56,34 +94,34 @@ def main():
     try:
         # Check if data was provided
         if len(sys.argv) < 2:
-            print(json.dumps({'error': 'No data provided'}))
+            print(json_dumps({'error': 'No data provided'}))
             sys.exit(1)
         
         # Parse JSON input from PHP
-        input_data = json.loads(sys.argv[1])
+        input_data = json_loads(sys.argv[1])
         
         # Validate input
         if 'text' not in input_data:
-            print(json.dumps({'error': 'Missing "text" field'}))
+            print(json_dumps({'error': 'Missing "text" field'}))
             sys.exit(1)
         
         text = input_data['text']
         
         if not text or not text.strip():
-            print(json.dumps({'error': 'Text cannot be empty'}))
+            print(json_dumps({'error': 'Text cannot be empty'}))
             sys.exit(1)
         
         # Analyze sentiment
         result = analyze_sentiment(text)
         
         # Return result as JSON (PHP will parse this)
-        print(json.dumps(result))
+        print(json_dumps(result))
         
     except json.JSONDecodeError as e:
-        print(json.dumps({'error': f'Invalid JSON: {str(e)}'}))
+        print(json_dumps({'error': f'Invalid JSON: {str(e)}'}))
         sys.exit(1)
     except Exception as e:
-        print(json.dumps({'error': str(e)}))
+        print(json_dumps({'error': str(e)}))
         sys.exit(1)
 
 
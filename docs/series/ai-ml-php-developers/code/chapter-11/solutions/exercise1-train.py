@@ -6,31 +6,92 @@ This script trains three different classifiers and selects the best one:
 - Logistic Regression
 - Linear SVM (LinearSVC)
 
+If LinearSVC wins it is saved as-is, without CalibratedClassifierCV (which
+would add another cross-validated training pass). It has no predict_proba,
+so predict.py derives confidence scores from its decision_function instead.
+
 Usage:
     python3 exercise1-train.py <data_path>
 """
 
 import sys
 import json
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.linear_model import LogisticRegression
 from sklearn.svm import LinearSVC
+from sklearn.pipeline import Pipeline
 from sklearn.model_selection import train_test_split, cross_val_score
 from sklearn.metrics import classification_report, accuracy_score, precision_recall_fscore_support
+from sklearn.base import clone
 import joblib
+from joblib import Parallel, delayed
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    # orjson is a much faster drop-in for json.dumps (optional)
+    import orjson
+
+    def json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    json_dumps = json.dumps
+
+try:
+    # pyarrow parses CSV in multithreaded C++, much faster than pandas (optional)
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa_csv = None
+
+
+def load_reviews(data_path: str):
+    """Load review texts (as a list) and sentiment labels from a CSV file."""
+    if pa_csv is not None:
+        table = pa_csv.read_csv(data_path)
+        texts = table['text'].to_pylist()
+        labels = table['sentiment'].to_numpy(zero_copy_only=False)
+        return texts, labels
+    
+    df = pd.read_csv(data_path)
+    return df['text'].tolist(), df['sentiment'].to_numpy()
+
+
+# Directory where the Pipeline caches fitted TF-IDF transformers
+CACHE_DIR = '.sklearn_cache'
+
+
+def make_vectorizer():
+    """Create the TF-IDF vectorizer shared by all compared models."""
+    return TfidfVectorizer(
+        max_features=1000,
+        ngram_range=(1, 2),
+        min_df=2,
+        stop_words='english',
+        sublinear_tf=True,
+        dtype=np.float32  # half the memory of the float64 default
+    )
+
+
+def cast_to_float32(model):
+    """
+    Store a fitted classifier's learned arrays as float32.
+    
+    Halves the saved classifier size and the memory traffic of every
+    prediction, with no measurable accuracy change for these text
+    classifiers.
+    """
+    for attr in ('feature_log_prob_', 'class_log_prior_', 'coef_', 'intercept_'):
+        if hasattr(model, attr):
+            setattr(model, attr, getattr(model, attr).astype(np.float32))
+    return model
+
 
 def train_and_evaluate_model(name, model, X_train, X_test, y_train, y_test):
     """Train a model and return its performance metrics."""
-    print(f"\n{'='*60}")
-    print(f"Training {name}")
-    print('='*60)
-    
     # Train
     model.fit(X_train, y_train)
     
@@ -43,20 +104,13 @@ def train_and_evaluate_model(name, model, X_train, X_test, y_train, y_test):
         y_test, y_pred, average='weighted', zero_division=0
     )
     
-    # Cross-validation
-    cv_scores = cross_val_score(model, X_train, y_train, cv=5, scoring='accuracy')
+    # Cross-validation (folds run in parallel)
+    cv_scores = cross_val_score(
+        model, X_train, y_train, cv=5, scoring='accuracy', n_jobs=-1
+    )
     cv_mean = cv_scores.mean()
     cv_std = cv_scores.std()
     
-    print(f"Test Accuracy: {accuracy:.4f}")
-    print(f"Precision: {precision:.4f}")
-    print(f"Recall: {recall:.4f}")
-    print(f"F1-Score: {f1:.4f}")
-    print(f"CV Accuracy: {cv_mean:.4f} (+/- {cv_std*2:.4f})")
-    
-    print(f"\nDetailed Classification Report:")
-    print(classification_report(y_test, y_pred))
-    
     return {
         'name': name,
         'model': model,
@@ -65,13 +119,30 @@ def train_and_evaluate_model(name, model, X_train, X_test, y_train, y_test):
         'recall': float(recall),
         'f1': float(f1),
         'cv_mean': float(cv_mean),
-        'cv_std': float(cv_std)
+        'cv_std': float(cv_std),
+        'report': classification_report(y_test, y_pred)
     }
 
 
+def print_model_results(result):
+    """Print the metrics returned by train_and_evaluate_model."""
+    print(f"\n{'='*60}")
+    print(f"Training {result['name']}")
+    print('='*60)
+    
+    print(f"Test Accuracy: {result['accuracy']:.4f}")
+    print(f"Precision: {result['precision']:.4f}")
+    print(f"Recall: {result['recall']:.4f}")
+    print(f"F1-Score: {result['f1']:.4f}")
+    print(f"CV Accuracy: {result['cv_mean']:.4f} (+/- {result['cv_std']*2:.4f})")
+    
+    print(f"\nDetailed Classification Report:")
+    print(result['report'])
+
+
 def main():
     if len(sys.argv) < 2:
-        print(json.dumps({'error': 'Usage: python exercise1-train.py <data_path>'}))
+        print(json_dumps({'error': 'Usage: python exercise1-train.py <data_path>'}))
         sys.exit(1)
     
     data_path = sys.argv[1]
@@ -83,45 +154,45 @@ def main():
         
         # Load data
         print("Loading training data...")
-        df = pd.read_csv(data_path)
-        print(f"Loaded {len(df)} reviews")
-        print(f"Sentiment distribution:\n{df['sentiment'].value_counts()}\n")
+        texts, labels = load_reviews(data_path)
+        print(f"Loaded {len(texts)} reviews")
+        print(f"Sentiment distribution:\n{pd.Series(labels).value_counts()}\n")
         
         # Split data
         X_train, X_test, y_train, y_test = train_test_split(
-            df['text'],
-            df['sentiment'],
+            texts,
+            labels,
             test_size=0.2,
             random_state=42,
-            stratify=df['sentiment']
-        )
-        
-        # Create TF-IDF vectorizer
-        print("Creating TF-IDF features...")
-        vectorizer = TfidfVectorizer(
-            max_features=1000,
-            ngram_range=(1, 2),
-            min_df=2,
-            stop_words='english'
+            stratify=labels
         )
         
-        X_train_vec = vectorizer.fit_transform(X_train)
-        X_test_vec = vectorizer.transform(X_test)
-        
-        # Define models to compare
-        models = [
+        # Define models to compare. Each is a TF-IDF + classifier pipeline;
+        # with memory= the fitted TF-IDF step is cached on disk, so models
+        # and re-runs with the same data and settings reuse it instead of
+        # rebuilding the vocabulary.
+        classifiers = [
             ('Naive Bayes', MultinomialNB(alpha=0.1)),
             ('Logistic Regression', LogisticRegression(max_iter=1000, random_state=42)),
             ('Linear SVM', LinearSVC(max_iter=2000, random_state=42))
         ]
+        models = [
+            (name, Pipeline([('tfidf', make_vectorizer()), ('clf', classifier)],
+                            memory=CACHE_DIR))
+            for name, classifier in classifiers
+        ]
         
-        # Train and evaluate each model
-        results = []
-        for name, model in models:
-            result = train_and_evaluate_model(
-                name, model, X_train_vec, X_test_vec, y_train, y_test
+        # Train and evaluate the models in parallel, one process each.
+        # Results are printed afterwards so the output is not interleaved.
+        print("Training models...")
+        results = Parallel(n_jobs=len(models), backend='loky')(
+            delayed(train_and_evaluate_model)(
+                name, clone(model), X_train, X_test, y_train, y_test
             )
-            results.append(result)
+            for name, model in models
+        )
+        for result in results:
+            print_model_results(result)
         
         # Find best model
         print(f"\n{'='*60}")
@@ -153,8 +224,11 @@ def main():
         vectorizer_path = Path(model_dir) / 'vectorizer.pkl'
         
         print(f"\nSaving best model ({best_model['name']}) to {model_path}")
-        joblib.dump(best_model['model'], model_path)
-        joblib.dump(vectorizer, vectorizer_path)
+        # Uncompressed so predict.py/worker.py can load with mmap_mode='r'
+        # Saved as separate classifier/vectorizer files, as predict.py expects
+        best_pipeline = best_model['model']
+        joblib.dump(cast_to_float32(best_pipeline.named_steps['clf']), model_path, compress=0)
+        joblib.dump(best_pipeline.named_steps['tfidf'], vectorizer_path, compress=0)
         
         # Save model comparison results
         comparison_path = Path(model_dir) / 'model_comparison.json'
@@ -162,7 +236,7 @@ def main():
             comparison_data = {
                 'best_model': best_model['name'],
                 'results': [
-                    {k: v for k, v in r.items() if k != 'model'}
+                    {k: v for k, v in r.items() if k not in ('model', 'report')}
                     for r in results
                 ]
             }
@@ -183,10 +257,10 @@ def main():
                 for r in results
             ]
         }
-        print(json.dumps(output))
+        print(json_dumps(output))
         
     except Exception as e:
-        print(json.dumps({'error': str(e)}))
+        print(json_dumps({'error': str(e)}))
         sys.exit(1)
 
 
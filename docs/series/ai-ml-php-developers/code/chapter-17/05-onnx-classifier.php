@@ -72,22 +72,63 @@ final class ONNXClassifier
     /**
      * Classify multiple images in batch
      *
+     * All images go to one Python process and one inference call, so
+     * startup and model loading are paid once for the whole batch.
+     *
      * @param array<string> $imagePaths Array of image file paths
      * @return array<string, array> Classification results keyed by image path
      */
     public function classifyBatch(array $imagePaths): array
     {
         $results = [];
+        $existingPaths = [];
 
         foreach ($imagePaths as $imagePath) {
-            try {
-                $results[$imagePath] = $this->classifyImage($imagePath);
-            } catch (Exception $e) {
-                $results[$imagePath] = ['error' => $e->getMessage()];
+            if (file_exists($imagePath)) {
+                $existingPaths[] = $imagePath;
+            } else {
+                $results[$imagePath] = ['error' => "Image file not found: {$imagePath}"];
             }
         }
 
-        return $results;
+        if (empty($existingPaths)) {
+            return $results;
+        }
+
+        $command = sprintf(
+            'python3 %s --image-paths %s %s %s %d 2>&1',
+            escapeshellarg($this->pythonScript),
+            escapeshellarg(json_encode($existingPaths)),
+            escapeshellarg($this->modelPath),
+            escapeshellarg($this->labelsPath),
+            $this->maxResults
+        );
+
+        $output = shell_exec($command);
+
+        if ($output === null) {
+            throw new RuntimeException('Failed to execute Python inference script');
+        }
+
+        $batchResults = json_decode($output, true);
+
+        if (!is_array($batchResults)) {
+            throw new RuntimeException("Invalid JSON output from inference script: {$output}");
+        }
+
+        if (isset($batchResults['error'])) {
+            throw new RuntimeException("Inference error: {$batchResults['error']}");
+        }
+
+        // Return results in the order the images were given
+        $ordered = [];
+        foreach ($imagePaths as $imagePath) {
+            $ordered[$imagePath] = $results[$imagePath]
+                ?? $batchResults[$imagePath]
+                ?? ['error' => 'No result returned for image'];
+        }
+
+        return $ordered;
     }
 
     /**
@@ -114,8 +155,13 @@ final class ONNXClassifier
 
 // Example usage if run directly
 if (basename(__FILE__) === basename($_SERVER['SCRIPT_FILENAME'] ?? '')) {
+    // Prefer the INT8 model built by quantize_model.py when available
+    $modelPath = file_exists(__DIR__ . '/models/mobilenetv2_int8.onnx')
+        ? __DIR__ . '/models/mobilenetv2_int8.onnx'
+        : __DIR__ . '/models/mobilenetv2-7.onnx';
+
     $classifier = new ONNXClassifier(
-        modelPath: __DIR__ . '/models/mobilenetv2-7.onnx',
+        modelPath: $modelPath,
         labelsPath: __DIR__ . '/data/imagenet_labels.json',
         pythonScript: __DIR__ . '/onnx_inference.py',
         maxResults: 5
@@ -0,0 +1,175 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * PersistentONNXClassifier - Keeps one Python inference process running
+ *
+ * ONNXClassifier starts Python and reloads the model for every image.
+ * This class starts `onnx_inference.py --serve` once with proc_open and
+ * sends it one JSON line per image, so only the first request pays for
+ * interpreter startup and model loading.
+ */
+final class PersistentONNXClassifier
+{
+    /** @var resource|null */
+    private $process = null;
+
+    /** @var array<int, resource> */
+    private array $pipes = [];
+
+    public function __construct(
+        private readonly string $modelPath,
+        private readonly string $labelsPath,
+        private readonly string $pythonScript,
+        private readonly int $maxResults = 5,
+    ) {
+        if (!file_exists($this->modelPath)) {
+            throw new InvalidArgumentException("Model file not found: {$this->modelPath}");
+        }
+
+        if (!file_exists($this->labelsPath)) {
+            throw new InvalidArgumentException("Labels file not found: {$this->labelsPath}");
+        }
+
+        if (!file_exists($this->pythonScript)) {
+            throw new InvalidArgumentException("Python script not found: {$this->pythonScript}");
+        }
+    }
+
+    public function __destruct()
+    {
+        $this->close();
+    }
+
+    /**
+     * Classify an image using the long-running inference process
+     *
+     * @param string $imagePath Path to image file
+     * @return array<array{label: string, confidence: float}>
+     * @throws RuntimeException If classification fails
+     */
+    public function classifyImage(string $imagePath): array
+    {
+        if (!file_exists($imagePath)) {
+            throw new InvalidArgumentException("Image file not found: {$imagePath}");
+        }
+
+        $this->start();
+
+        $request = json_encode([
+            'image_path' => $imagePath,
+            'top_k' => $this->maxResults,
+        ]);
+
+        fwrite($this->pipes[0], $request . "\n");
+        $output = fgets($this->pipes[1]);
+
+        if ($output === false) {
+            $this->close();
+            throw new RuntimeException('Inference process exited unexpectedly');
+        }
+
+        $result = json_decode($output, true);
+
+        if (!is_array($result)) {
+            throw new RuntimeException("Invalid JSON output from inference process: {$output}");
+        }
+
+        if (isset($result['error'])) {
+            throw new RuntimeException("Inference error: {$result['error']}");
+        }
+
+        return $result;
+    }
+
+    /**
+     * Stop the inference process
+     */
+    public function close(): void
+    {
+        if ($this->process === null) {
+            return;
+        }
+
+        foreach ($this->pipes as $pipe) {
+            fclose($pipe);
+        }
+
+        proc_close($this->process);
+        $this->process = null;
+        $this->pipes = [];
+    }
+
+    private function start(): void
+    {
+        if ($this->process !== null) {
+            return;
+        }
+
+        $descriptors = [
+            0 => ['pipe', 'r'],  // stdin: one JSON request per line
+            1 => ['pipe', 'w'],  // stdout: one JSON response per line
+            // stderr: Python errors go to PHP's stderr (the STDERR constant
+            // only exists under the CLI SAPI, not php-fpm or Apache)
+            2 => ['file', 'php://stderr', 'w'],
+        ];
+
+        $process = proc_open(
+            ['python3', $this->pythonScript, '--serve', $this->modelPath, $this->labelsPath],
+            $descriptors,
+            $this->pipes
+        );
+
+        if (!is_resource($process)) {
+            throw new RuntimeException('Failed to start Python inference process');
+        }
+
+        $this->process = $process;
+    }
+}
+
+// Example usage if run directly
+if (basename(__FILE__) === basename($_SERVER['SCRIPT_FILENAME'] ?? '')) {
+    // Prefer the INT8 model built by quantize_model.py when available
+    $modelPath = file_exists(__DIR__ . '/models/mobilenetv2_int8.onnx')
+        ? __DIR__ . '/models/mobilenetv2_int8.onnx'
+        : __DIR__ . '/models/mobilenetv2-7.onnx';
+
+    $classifier = new PersistentONNXClassifier(
+        modelPath: $modelPath,
+        labelsPath: __DIR__ . '/data/imagenet_labels.json',
+        pythonScript: __DIR__ . '/onnx_inference.py',
+        maxResults: 3
+    );
+
+    $images = glob(__DIR__ . '/data/sample_images/*.{jpg,jpeg,png}', GLOB_BRACE);
+
+    if (empty($images)) {
+        echo "No sample images found in data/sample_images/\n";
+        exit(1);
+    }
+
+    echo "Persistent ONNX Classification\n";
+    echo str_repeat('=', 50) . "\n\n";
+
+    foreach ($images as $imagePath) {
+        try {
+            $startTime = microtime(true);
+            $results = $classifier->classifyImage($imagePath);
+            $duration = microtime(true) - $startTime;
+
+            printf(
+                "%-25s %-25s %5.1f%%  (%dms)\n",
+                basename($imagePath),
+                $results[0]['label'] ?? '-',
+                ($results[0]['confidence'] ?? 0) * 100,
+                round($duration * 1000)
+            );
+        } catch (Exception $e) {
+            echo basename($imagePath) . ": Error: " . $e->getMessage() . "\n";
+        }
+    }
+
+    echo "\nOnly the first image pays for starting Python and loading the model.\n";
+}
@@ -2,16 +2,33 @@
 """
 ONNX Image Classification Inference Script
 Performs image classification using ONNX Runtime and MobileNetV2
-Called from PHP via shell_exec for local model inference
+Called from PHP via shell_exec for local model inference, or run with
+--serve as a long-lived process that keeps the model loaded
 """
 
+import os
 import sys
 import json
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from PIL import Image
 import onnxruntime as ort
 
-def preprocess_image(image_path):
+# ImageNet normalization folded into one multiply-add on raw 0-255 pixels:
+# (pixel / 255 - mean) / std == pixel * SCALE - BIAS
+IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+SCALE = 1.0 / (IMAGENET_STD * 255.0)
+BIAS = IMAGENET_MEAN / IMAGENET_STD
+
+# Compiled OpenVINO blobs are cached here, so later processes (e.g. each
+# PHP shell_exec call) skip model compilation
+OPENVINO_CACHE_DIR = '/tmp/ov_cache'
+
+# MobileNetV2 input tensor shape: (batch, channels, height, width)
+INPUT_SHAPE = (1, 3, 224, 224)
+
+def preprocess_image(image_path, out=None):
     """
     Preprocess image for MobileNetV2 model:
     - Resize to 224x224
@@ -22,9 +39,10 @@ def preprocess_image(image_path):
     
     Args:
         image_path: Path to input image file
+        out: Optional float32 array of INPUT_SHAPE to write the result into
         
     Returns:
-        numpy.ndarray: Preprocessed image tensor
+        numpy.ndarray: Preprocessed image tensor (`out` when given)
     """
     try:
         img = Image.open(image_path).convert('RGB')
@@ -34,102 +52,387 @@ def preprocess_image(image_path):
     # Resize to model input size
     img = img.resize((224, 224), Image.BILINEAR)
     
-    # Convert to numpy array and normalize to [0, 1]
-    img_array = np.array(img).astype(np.float32) / 255.0
-    
-    # Apply ImageNet normalization
-    mean = np.array([0.485, 0.456, 0.406])
-    std = np.array([0.229, 0.224, 0.225])
-    img_array = (img_array - mean) / std
-    
-    # Transpose from HWC (Height, Width, Channels) to CHW
-    img_array = np.transpose(img_array, (2, 0, 1))
+    # Scale to [0, 1] and apply ImageNet normalization in one float32 pass
+    img_array = np.asarray(img, dtype=np.uint8).astype(np.float32) * SCALE - BIAS
     
-    # Add batch dimension: (C, H, W) -> (1, C, H, W)
-    img_array = np.expand_dims(img_array, axis=0)
+    # Transpose from HWC (Height, Width, Channels) to CHW and add the batch
+    # dimension: (H, W, C) -> (1, C, H, W), contiguous as ONNX Runtime expects
+    if out is not None:
+        out[0] = img_array.transpose(2, 0, 1)
+        return out
     
-    return img_array
+    return np.ascontiguousarray(img_array.transpose(2, 0, 1))[None]
 
-def softmax(x):
+def get_providers(num_threads):
     """
-    Compute softmax values for array x
+    Choose execution providers, preferring OpenVINO when installed
+    
+    The OpenVINO provider (pip package onnxruntime-openvino) is faster
+    than the default CPU provider on Intel CPUs. Nodes it cannot run
+    fall back to the CPU provider.
     
     Args:
-        x: Input array
+        num_threads: Number of inference threads
         
     Returns:
-        numpy.ndarray: Softmax probabilities
+        list: Providers for ort.InferenceSession
     """
-    exp_x = np.exp(x - np.max(x))
-    return exp_x / exp_x.sum()
+    if 'OpenVINOExecutionProvider' not in ort.get_available_providers():
+        return ['CPUExecutionProvider']
+    
+    openvino_options = {
+        'device_type': 'CPU',
+        'precision': 'FP32',
+        'num_of_threads': num_threads,
+        'cache_dir': OPENVINO_CACHE_DIR,
+    }
+    
+    return [('OpenVINOExecutionProvider', openvino_options), 'CPUExecutionProvider']
 
-def classify_image(model_path, image_path, labels_path, top_k=5):
+def create_session(model_path):
     """
-    Classify an image using ONNX model
+    Create an ONNX Runtime inference session
+    
+    Building a session parses the graph, runs graph optimizations and packs
+    weights, which usually costs far more than one inference. Create it once
+    and reuse it (see serve()).
     
     Args:
         model_path: Path to ONNX model file
-        image_path: Path to image to classify
-        labels_path: Path to JSON file containing class labels
-        top_k: Number of top predictions to return
         
     Returns:
-        list: List of dicts with 'label' and 'confidence' keys
+        ort.InferenceSession: Ready-to-run session
     """
-    # Load ONNX model
+    sess_options = ort.SessionOptions()
+    sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    
+    # Single-image inference gains little beyond a few threads, and the
+    # default (one thread per core) oversubscribes when PHP runs several
+    # classifiers side by side. The graph is a plain chain, so run it
+    # sequentially without an inter-op thread pool.
+    num_threads = min(4, os.cpu_count() or 1)
+    sess_options.intra_op_num_threads = num_threads
+    sess_options.inter_op_num_threads = 1
+    sess_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    
+    # Input shape is fixed, so reuse the planned memory layout and arena
+    # blocks across runs instead of allocating per inference
+    sess_options.enable_mem_pattern = True
+    sess_options.enable_cpu_mem_arena = True
+    sess_options.add_session_config_entry('session.dynamic_block_base', '4')
+    
     try:
-        session = ort.InferenceSession(
+        return ort.InferenceSession(
             model_path,
-            providers=['CPUExecutionProvider']
+            sess_options,
+            providers=get_providers(num_threads)
         )
     except Exception as e:
         raise RuntimeError(f"Failed to load ONNX model: {e}")
+
+def create_io_binding(session, input_buffer=None):
+    """
+    Bind a preallocated input buffer to the session
+    
+    session.run() converts and validates the input array on every call.
+    With an IOBinding the input tensor is bound once, by pointer, to a
+    buffer that preprocess_image() writes into directly.
+    
+    Args:
+        session: ONNX Runtime session from create_session()
+        input_buffer: Optional float32 array of INPUT_SHAPE to bind
+            (allocated when not given)
+        
+    Returns:
+        tuple: (io_binding, input_buffer) - keep input_buffer alive while
+        the binding is in use, the bound OrtValue shares its memory
+    """
+    if input_buffer is None:
+        input_buffer = np.empty(INPUT_SHAPE, dtype=np.float32)
+    input_ortvalue = ort.OrtValue.ortvalue_from_numpy(input_buffer, 'cpu')
+    
+    io_binding = session.io_binding()
+    io_binding.bind_ortvalue_input(session.get_inputs()[0].name, input_ortvalue)
+    io_binding.bind_output(session.get_outputs()[0].name, 'cpu')
+    
+    return io_binding, input_buffer
+
+def load_labels(labels_path):
+    """
+    Load class labels from a JSON file
     
-    # Preprocess image
+    Args:
+        labels_path: Path to JSON file containing class labels
+        
+    Returns:
+        list: Class labels indexed by class id
+    """
+    try:
+        with open(labels_path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        raise RuntimeError(f"Failed to load labels: {e}")
+
+def classify_image_with_session(session, labels, image_path, top_k=5, binding=None):
+    """
+    Classify an image using an already created session
+    
+    Args:
+        session: ONNX Runtime session from create_session()
+        labels: Class labels from load_labels()
+        image_path: Path to image to classify
+        top_k: Number of top predictions to return
+        binding: Optional (io_binding, input_buffer) from create_io_binding(),
+            reused across calls to avoid per-call input allocation
+        
+    Returns:
+        list: List of dicts with 'label' and 'confidence' keys
+    """
+    if binding is None:
+        binding = create_io_binding(session)
+    io_binding, input_buffer = binding
+    
+    # Preprocess image straight into the bound input buffer
     try:
-        input_data = preprocess_image(image_path)
+        preprocess_image(image_path, out=input_buffer)
     except Exception as e:
         raise RuntimeError(f"Failed to preprocess image: {e}")
     
-    # Get input name from model
-    input_name = session.get_inputs()[0].name
+    return run_classification(session, labels, io_binding, top_k)
+
+def run_classification(session, labels, io_binding, top_k):
+    """
+    Run inference on the image already in the bound input buffer
     
-    # Run inference
+    Args:
+        session: ONNX Runtime session from create_session()
+        labels: Class labels from load_labels()
+        io_binding: IOBinding from create_io_binding()
+        top_k: Number of top predictions to return
+        
+    Returns:
+        list: List of dicts with 'label' and 'confidence' keys
+    """
     try:
-        outputs = session.run(None, {input_name: input_data})
-        predictions = outputs[0][0]  # Remove batch dimension
+        session.run_with_iobinding(io_binding)
+        predictions = io_binding.get_outputs()[0].numpy()[0]  # Remove batch dimension
     except Exception as e:
         raise RuntimeError(f"Inference failed: {e}")
     
-    # Apply softmax to get probabilities
-    probabilities = softmax(predictions)
+    return top_predictions(predictions, labels, top_k)
+
+def top_predictions(predictions, labels, top_k):
+    """
+    Turn one image's model output into the top-K labelled results
     
-    # Get top-K predictions
-    top_indices = np.argsort(probabilities)[-top_k:][::-1]
+    Args:
+        predictions: Raw model output (logits) for a single image
+        labels: Class labels from load_labels()
+        top_k: Number of top predictions to return
+        
+    Returns:
+        list: List of dicts with 'label' and 'confidence' keys
+    """
+    # Softmax preserves the ordering, so rank the raw logits directly:
+    # argpartition finds the K largest in linear time, then only those K
+    # are sorted instead of all 1000 classes
+    k = min(top_k, predictions.shape[0])
+    top_part = np.argpartition(-predictions, k - 1)[:k]
+    top_indices = top_part[np.argsort(-predictions[top_part])]
     
-    # Load class labels
-    try:
-        with open(labels_path, 'r') as f:
-            labels = json.load(f)
-    except Exception as e:
-        raise RuntimeError(f"Failed to load labels: {e}")
+    # Softmax probabilities are only computed for the selected classes.
+    # The denominator still sums over every class, so confidences stay
+    # comparable with thresholds (they are not renormalized to the top K).
+    max_logit = predictions.max()
+    denominator = np.exp(predictions - max_logit).sum()
+    probabilities = np.exp(predictions[top_indices] - max_logit) / denominator
     
     # Build results
     results = []
-    for idx in top_indices:
+    for idx, probability in zip(top_indices, probabilities):
         if idx < len(labels):
             results.append({
                 'label': labels[idx],
-                'confidence': float(probabilities[idx])
+                'confidence': float(probability)
             })
     
     return results
 
+def classify_images_with_session(session, labels, image_paths, top_k=5):
+    """
+    Classify several images with a single inference call
+    
+    Running the images as one (N, 3, 224, 224) batch reads the weights and
+    wakes the thread pool once instead of once per image. Images are decoded
+    and resized on a thread pool, since Pillow releases the GIL for that work.
+    
+    Args:
+        session: ONNX Runtime session from create_session()
+        labels: Class labels from load_labels()
+        image_paths: Paths of the images to classify
+        top_k: Number of top predictions to return
+        
+    Returns:
+        dict: Results list (or {'error': ...}) keyed by image path
+    """
+    if not image_paths:
+        return {}
+    
+    batch = np.empty((len(image_paths),) + INPUT_SHAPE[1:], dtype=np.float32)
+    
+    def preprocess_row(row):
+        try:
+            preprocess_image(image_paths[row], out=batch[row:row + 1])
+            return None
+        except Exception as e:
+            return f"Failed to preprocess image: {e}"
+    
+    with ThreadPoolExecutor(max_workers=min(len(image_paths), os.cpu_count() or 1)) as executor:
+        errors = list(executor.map(preprocess_row, range(len(image_paths))))
+    
+    # Images that failed to load are reported individually; only the
+    # valid rows are sent to the model
+    valid_rows = [row for row, error in enumerate(errors) if error is None]
+    if len(valid_rows) < len(image_paths):
+        batch = batch[valid_rows]
+    
+    results = {path: {'error': error} for path, error in zip(image_paths, errors) if error}
+    
+    if valid_rows:
+        try:
+            input_name = session.get_inputs()[0].name
+            predictions = session.run(None, {input_name: batch})[0]
+        except Exception as e:
+            raise RuntimeError(f"Inference failed: {e}")
+        
+        for row, row_predictions in zip(valid_rows, predictions):
+            results[image_paths[row]] = top_predictions(row_predictions, labels, top_k)
+    
+    # Keep the input order in the JSON output
+    return {path: results[path] for path in image_paths}
+
+def classify_image(model_path, image_path, labels_path, top_k=5):
+    """
+    Classify an image using ONNX model
+    
+    Args:
+        model_path: Path to ONNX model file
+        image_path: Path to image to classify
+        labels_path: Path to JSON file containing class labels
+        top_k: Number of top predictions to return
+        
+    Returns:
+        list: List of dicts with 'label' and 'confidence' keys
+    """
+    input_buffer = np.empty(INPUT_SHAPE, dtype=np.float32)
+    
+    # Building the session (graph parsing, weight packing) and decoding the
+    # image are independent and both release the GIL, so preprocess on a
+    # background thread while the session is created
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        preprocessing = executor.submit(preprocess_image, image_path, input_buffer)
+        
+        session = create_session(model_path)
+        labels = load_labels(labels_path)
+        
+        try:
+            preprocessing.result()
+        except Exception as e:
+            raise RuntimeError(f"Failed to preprocess image: {e}")
+    
+    io_binding, _ = create_io_binding(session, input_buffer)
+    
+    return run_classification(session, labels, io_binding, top_k)
+
+def parse_image_paths(value):
+    """
+    Parse the --image-paths argument
+    
+    Accepts a comma-separated list (a.jpg,b.jpg) or a JSON array, which
+    PHP can build with json_encode() when paths may contain commas.
+    
+    Args:
+        value: Raw command line value
+        
+    Returns:
+        list: Image paths
+    """
+    if value.lstrip().startswith('['):
+        return json.loads(value)
+    
+    return [path for path in value.split(',') if path]
+
+def serve(model_path, labels_path):
+    """
+    Long-running mode: load the model once, then classify images on request
+    
+    Reads one JSON request per line from stdin, e.g.
+        {"image_path": "cat.jpg", "top_k": 5}
+    or, for a batch, {"image_paths": ["cat.jpg", "dog.jpg"], "top_k": 5},
+    and writes one JSON line per request to stdout (the results, or
+    {"error": ...}). PHP keeps the process open with proc_open, so only the
+    first request pays for loading the model.
+    
+    Args:
+        model_path: Path to ONNX model file
+        labels_path: Path to JSON file containing class labels
+    """
+    session = create_session(model_path)
+    binding = create_io_binding(session)
+    labels = load_labels(labels_path)
+    
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        
+        try:
+            request = json.loads(line)
+            top_k = int(request.get('top_k', 5))
+            
+            if 'image_paths' in request:
+                response = classify_images_with_session(
+                    session, labels, request['image_paths'], top_k
+                )
+            else:
+                response = classify_image_with_session(
+                    session, labels, request['image_path'], top_k, binding
+                )
+        except Exception as e:
+            response = {'error': str(e)}
+        
+        sys.stdout.write(json.dumps(response) + '\n')
+        sys.stdout.flush()
+
 def main():
     """Main entry point for CLI usage"""
+    if len(sys.argv) == 4 and sys.argv[1] == '--serve':
+        try:
+            serve(sys.argv[2], sys.argv[3])
+            sys.exit(0)
+        except Exception as e:
+            print(json.dumps({'error': str(e)}))
+            sys.exit(1)
+    
+    if len(sys.argv) >= 5 and sys.argv[1] == '--image-paths':
+        try:
+            image_paths = parse_image_paths(sys.argv[2])
+            top_k = int(sys.argv[5]) if len(sys.argv) > 5 else 5
+            
+            session = create_session(sys.argv[3])
+            labels = load_labels(sys.argv[4])
+            
+            results = classify_images_with_session(session, labels, image_paths, top_k)
+            print(json.dumps(results, indent=2))
+            sys.exit(0)
+        except Exception as e:
+            print(json.dumps({'error': str(e)}))
+            sys.exit(1)
+    
     if len(sys.argv) < 4:
         error_response = {
-            'error': 'Usage: python3 onnx_inference.py <model_path> <image_path> <labels_path> [top_k]'
+            'error': 'Usage: python3 onnx_inference.py <model_path> <image_path> <labels_path> [top_k]\n'
+                     '       python3 onnx_inference.py --image-paths <a.jpg,b.jpg> <model_path> <labels_path> [top_k]\n'
+                     '       python3 onnx_inference.py --serve <model_path> <labels_path>'
         }
         print(json.dumps(error_response))
         sys.exit(1)
@@ -150,4 +453,3 @@ def main():
 
 if __name__ == '__main__':
     main()
-
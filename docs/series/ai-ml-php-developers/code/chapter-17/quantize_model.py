@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+INT8 Static Quantization for MobileNetV2
+Converts the FP32 ONNX model to INT8 using a small calibration set of images
+
+INT8 convolutions run roughly 2-4x faster than FP32 on CPUs with AVX2/VNNI,
+and the model file shrinks about 4x. Static quantization (with calibration)
+is used because dynamic quantization tends to be slower for Conv-heavy CNNs,
+and the QOperator format lets ONNX Runtime use fused QLinearConv kernels.
+
+Usage:
+    python3 quantize_model.py [model_path] [calibration_dir] [output_path]
+
+Defaults:
+    models/mobilenetv2-7.onnx  data/sample_images  models/mobilenetv2_int8.onnx
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+import onnxruntime as ort
+from onnxruntime.quantization import (
+    CalibrationDataReader,
+    QuantFormat,
+    QuantType,
+    quantize_static,
+)
+from onnxruntime.quantization.shape_inference import quant_pre_process
+
+from onnx_inference import preprocess_image
+
+# Around 100 representative images is enough for calibration
+MAX_CALIBRATION_IMAGES = 100
+
+class ImageCalibrationDataReader(CalibrationDataReader):
+    """
+    Feeds preprocessed images to the quantizer so it can measure
+    activation ranges
+    """
+
+    def __init__(self, model_path, image_paths):
+        session = ort.InferenceSession(model_path, providers=['CPUExecutionProvider'])
+        self.input_name = session.get_inputs()[0].name
+        self.image_paths = iter(image_paths)
+
+    def get_next(self):
+        image_path = next(self.image_paths, None)
+        if image_path is None:
+            return None
+
+        # Same (1, 3, 224, 224) float32 input as used for inference
+        return {self.input_name: preprocess_image(str(image_path))}
+
+def find_calibration_images(calibration_dir):
+    """
+    Collect up to MAX_CALIBRATION_IMAGES images from a directory
+
+    Args:
+        calibration_dir: Directory containing JPEG/PNG images
+
+    Returns:
+        list: Image paths
+    """
+    images = sorted(
+        path for path in Path(calibration_dir).iterdir()
+        if path.suffix.lower() in ('.jpg', '.jpeg', '.png')
+    )
+
+    if not images:
+        raise ValueError(f"No calibration images found in {calibration_dir}")
+
+    return images[:MAX_CALIBRATION_IMAGES]
+
+def quantize_model(model_path, calibration_dir, output_path):
+    """
+    Quantize an FP32 ONNX model to INT8 (QOperator format)
+
+    Args:
+        model_path: Path to the FP32 ONNX model
+        calibration_dir: Directory of representative images
+        output_path: Where to write the INT8 model
+
+    Returns:
+        dict: Summary with model sizes
+    """
+    images = find_calibration_images(calibration_dir)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Shape inference + graph cleanup recommended before quantization.
+        # Plain ONNX shape inference covers a CNN's static shapes, so the
+        # symbolic pass (which needs sympy) is skipped.
+        prepared_path = str(Path(tmp_dir) / 'prepared.onnx')
+        quant_pre_process(model_path, prepared_path, skip_symbolic_shape=True)
+
+        quantize_static(
+            prepared_path,
+            output_path,
+            ImageCalibrationDataReader(prepared_path, images),
+            quant_format=QuantFormat.QOperator,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=True,
+            reduce_range=False,
+        )
+
+    return {
+        'model_path': output_path,
+        'calibration_images': len(images),
+        'fp32_size_mb': round(Path(model_path).stat().st_size / 1024 / 1024, 2),
+        'int8_size_mb': round(Path(output_path).stat().st_size / 1024 / 1024, 2),
+    }
+
+def main():
+    """Main entry point for CLI usage"""
+    model_path = sys.argv[1] if len(sys.argv) > 1 else 'models/mobilenetv2-7.onnx'
+    calibration_dir = sys.argv[2] if len(sys.argv) > 2 else 'data/sample_images'
+    output_path = sys.argv[3] if len(sys.argv) > 3 else 'models/mobilenetv2_int8.onnx'
+
+    try:
+        result = quantize_model(model_path, calibration_dir, output_path)
+        print(json.dumps(result, indent=2))
+        sys.exit(0)
+    except Exception as e:
+        print(json.dumps({'error': str(e)}))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+<?php
+
+declare(strict_types=1);
+
+/**
+ * YOLO Detection Server Client
+ *
+ * Sends image paths to yolo_server.py over HTTP instead of starting
+ * detect_yolo.py for every image. The server keeps PyTorch and the model
+ * loaded, so each request only pays for inference.
+ *
+ * Start the server first:
+ *   python3 yolo_server.py
+ *
+ * The server detects with the model it preloaded (YOLO_MODEL). Only pass
+ * $modelName to check that the server runs the model you expect.
+ */
+
+final class YoloServerDetector
+{
+    public function __construct(
+        private readonly string $serverUrl = 'http://127.0.0.1:8765',
+        private readonly ?string $modelName = null,
+        private readonly float $confidenceThreshold = 0.25,
+        private readonly int $timeoutSeconds = 30
+    ) {}
+
+    /**
+     * Detect objects in image.
+     *
+     * @param string $imagePath Path to image file (must be readable by the server)
+     * @return array Detection results
+     * @throws RuntimeException On detection failure
+     */
+    public function detect(string $imagePath): array
+    {
+        if (!file_exists($imagePath)) {
+            throw new RuntimeException("Image not found: {$imagePath}");
+        }
+
+        $request = [
+            'image_path' => realpath($imagePath),
+            'confidence' => $this->confidenceThreshold,
+        ];
+
+        if ($this->modelName !== null) {
+            $request['model'] = $this->modelName;
+        }
+
+        $context = stream_context_create([
+            'http' => [
+                'method' => 'POST',
+                'header' => "Content-Type: application/json\r\n",
+                'content' => json_encode($request),
+                'timeout' => $this->timeoutSeconds,
+                'ignore_errors' => true,
+            ],
+        ]);
+
+        $startTime = microtime(true);
+        $output = @file_get_contents($this->serverUrl . '/detect', false, $context);
+        $executionTime = microtime(true) - $startTime;
+
+        if ($output === false) {
+            throw new RuntimeException(
+                "Detection server not reachable at {$this->serverUrl}. Start it with: python3 yolo_server.py"
+            );
+        }
+
+        $result = json_decode($output, true);
+
+        if (!is_array($result)) {
+            throw new RuntimeException(
+                "Invalid JSON from detection server. Output: " . substr($output, 0, 500)
+            );
+        }
+
+        if (!($result['success'] ?? false)) {
+            throw new RuntimeException(
+                "Detection failed: " . ($result['error'] ?? json_encode($result['detail'] ?? 'Unknown error'))
+            );
+        }
+
+        // Add execution time
+        $result['execution_time'] = round($executionTime, 3);
+
+        return $result;
+    }
+}
+
+// Example usage if run directly
+if (basename(__FILE__) === basename($_SERVER['SCRIPT_FILENAME'] ?? '')) {
+    $images = array_slice($argv, 1);
+
+    if (empty($images)) {
+        echo "Usage: php 11-yolo-server-client.php <image> [image...]\n";
+        exit(1);
+    }
+
+    $detector = new YoloServerDetector();
+
+    echo "YOLO Detection (persistent server)\n";
+    echo str_repeat('=', 50) . "\n\n";
+
+    foreach ($images as $imagePath) {
+        try {
+            $result = $detector->detect($imagePath);
+
+            printf(
+                "%-30s %2d objects  (%dms)\n",
+                basename($imagePath),
+                $result['count'],
+                round($result['execution_time'] * 1000)
+            );
+
+            foreach ($result['detections'] as $detection) {
+                printf("  - %-15s %5.1f%%\n", $detection['class'], $detection['confidence'] * 100);
+            }
+        } catch (Exception $e) {
+            echo basename($imagePath) . ": Error: " . $e->getMessage() . "\n";
+        }
+    }
+}
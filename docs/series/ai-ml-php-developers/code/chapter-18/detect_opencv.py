@@ -2,7 +2,8 @@
 """
 OpenCV Face Detection Script
 
-Uses Haar Cascades for fast face detection without ML models.
+Uses an LBP cascade (falling back to Haar) for fast face detection
+without ML models.
 Privacy-friendly: runs completely offline.
 """
 
@@ -10,48 +11,86 @@ import sys
 import json
 import cv2
 from pathlib import Path
+from typing import Optional
 
-def detect_faces(image_path: str, scale_factor: float = 1.1, min_neighbors: int = 5):
+# LBP cascades use integer comparisons instead of Haar's floating-point
+# features, typically 2-3x faster with little accuracy loss. pip's
+# opencv-python only ships the Haar files, so the LBP cascade is looked up
+# in models/ (see README) and Haar is used when it is missing.
+LBP_CASCADE_PATH = Path(__file__).parent / 'models' / 'lbpcascade_frontalface_improved.xml'
+HAAR_CASCADE_PATH = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+
+def load_face_cascade():
+    """
+    Load the fastest available frontal face cascade.
+
+    Returns:
+        Tuple of (CascadeClassifier, method name for the JSON output)
+    """
+    if LBP_CASCADE_PATH.exists():
+        return cv2.CascadeClassifier(str(LBP_CASCADE_PATH)), 'OpenCV LBP Cascade'
+
+    return cv2.CascadeClassifier(HAAR_CASCADE_PATH), 'OpenCV Haar Cascades'
+
+# Load and parse the cascade XML once at import time rather than on every
+# detect_faces() call
+FACE_CASCADE, CASCADE_METHOD = load_face_cascade()
+
+# A coarser image pyramid (fewer scales to scan) suits the LBP cascade;
+# Haar keeps its usual, finer 1.1 to avoid missing faces between scales
+DEFAULT_SCALE_FACTOR = 1.2 if CASCADE_METHOD == 'OpenCV LBP Cascade' else 1.1
+
+# Detection cost grows with pixel count, so larger images are downscaled
+# until their longest side is at most this many pixels
+MAX_DETECTION_SIZE = 640.0
+
+def detect_faces(image_path: str, scale_factor: Optional[float] = None, min_neighbors: int = 5):
     """
-    Detect faces using OpenCV Haar Cascades.
+    Detect faces using an OpenCV cascade classifier.
 
     Args:
         image_path: Path to image file
-        scale_factor: How much image size is reduced at each scale (1.1 = 10%)
+        scale_factor: How much image size is reduced at each scale (1.2 = 20%);
+            defaults to DEFAULT_SCALE_FACTOR for the loaded cascade
         min_neighbors: Minimum neighbors for detection (higher = fewer false positives)
 
     Returns:
         Detection results in JSON format
     """
+    if scale_factor is None:
+        scale_factor = DEFAULT_SCALE_FACTOR
+
     try:
-        # Load image
-        image = cv2.imread(image_path)
+        # Load image straight as grayscale (cascades work on grayscale);
+        # the decoder skips building a BGR image and converting it
+        gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
 
-        if image is None:
+        if gray is None:
             return {
                 'success': False,
                 'error': f'Failed to load image: {image_path}'
             }
 
-        # Convert to grayscale (Haar Cascades work on grayscale)
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-
-        # Load Haar Cascade classifier for frontal faces
-        cascade_path = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-        face_cascade = cv2.CascadeClassifier(cascade_path)
+        # Downscale large photos before detection; boxes are mapped back
+        # to original image coordinates below
+        height, width = gray.shape
+        scale = min(1.0, MAX_DETECTION_SIZE / max(height, width))
+        if scale < 1.0:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        min_size = max(1, int(30 * scale))
 
-        if face_cascade.empty():
+        if FACE_CASCADE.empty():
             return {
                 'success': False,
-                'error': 'Failed to load Haar Cascade classifier'
+                'error': f'Failed to load {CASCADE_METHOD} classifier'
             }
 
         # Detect faces
-        faces = face_cascade.detectMultiScale(
+        faces = FACE_CASCADE.detectMultiScale(
             gray,
             scaleFactor=scale_factor,
             minNeighbors=min_neighbors,
-            minSize=(30, 30)
+            minSize=(min_size, min_size)
         )
 
         # Format results
@@ -59,12 +98,12 @@ def detect_faces(image_path: str, scale_factor: float = 1.1, min_neighbors: int
         for (x, y, w, h) in faces:
             detections.append({
                 'class': 'face',
-                'confidence': 0.85,  # Haar Cascades don't provide confidence scores
+                'confidence': 0.85,  # Cascades don't provide confidence scores
                 'bbox': {
-                    'x': int(x),
-                    'y': int(y),
-                    'width': int(w),
-                    'height': int(h)
+                    'x': int(x / scale),
+                    'y': int(y / scale),
+                    'width': int(w / scale),
+                    'height': int(h / scale)
                 }
             })
 
@@ -73,7 +112,7 @@ def detect_faces(image_path: str, scale_factor: float = 1.1, min_neighbors: int
             'detections': detections,
             'count': len(detections),
             'image_path': str(image_path),
-            'method': 'OpenCV Haar Cascades'
+            'method': CASCADE_METHOD
         }
 
     except Exception as e:
@@ -91,7 +130,7 @@ if __name__ == '__main__':
         sys.exit(1)
 
     image_path = sys.argv[1]
-    scale_factor = float(sys.argv[2]) if len(sys.argv) > 2 else 1.1
+    scale_factor = float(sys.argv[2]) if len(sys.argv) > 2 else None
     min_neighbors = int(sys.argv[3]) if len(sys.argv) > 3 else 5
 
     result = detect_faces(image_path, scale_factor, min_neighbors)
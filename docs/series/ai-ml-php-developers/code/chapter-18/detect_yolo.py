@@ -4,12 +4,249 @@ YOLOv8 Object Detection Script
 
 Accepts image path as argument, runs detection, outputs JSON results.
 Returns array of detections with bounding boxes, classes, and confidence scores.
+
+Pass an exported .onnx model (see --export) to run on ONNX Runtime instead
+of PyTorch: typically 2-4x faster on CPU, and PyTorch is never imported.
 """
 
+import ast
 import sys
 import json
+from functools import lru_cache
 from pathlib import Path
-from ultralytics import YOLO
+
+import cv2
+import numpy as np
+
+# Input size the ONNX model is exported with
+ONNX_IMAGE_SIZE = 640
+
+# Same defaults as ultralytics' own postprocessing
+NMS_IOU_THRESHOLD = 0.7
+MAX_DETECTIONS = 300
+
+@lru_cache(maxsize=None)
+def load_model(model_name: str = 'yolov8n.pt'):
+    """
+    Load a YOLO model once per process.
+
+    A long-running process (see yolo_server.py) reuses the loaded model
+    for every request instead of reloading the weights each time.
+    """
+    # Imported here so the ONNX path does not pay for importing PyTorch
+    from ultralytics import YOLO
+
+    return YOLO(model_name)
+
+@lru_cache(maxsize=None)
+def use_half_precision() -> bool:
+    """
+    Whether PyTorch inference should run in FP16.
+
+    Only on a CUDA GPU: FP16 roughly doubles GPU throughput, while on CPU it
+    is slower or unsupported.
+    """
+    import torch
+
+    return torch.cuda.is_available()
+
+def export_onnx(model_name: str = 'yolov8n.pt', half: bool = False) -> str:
+    """
+    Export a YOLOv8 PyTorch model to ONNX (one-time step).
+
+    The class names are stored in the ONNX metadata, so the exported file
+    is all detect_objects() needs.
+
+    Args:
+        model_name: YOLO model to export
+        half: Export FP16 weights. Halves the model size and roughly doubles
+            GPU throughput (onnxruntime-gpu). ultralytics only exports FP16
+            on a GPU, and the CPU provider has few FP16 kernels, so keep
+            FP32 for CPU-only deployments.
+
+    Returns:
+        Path of the exported .onnx file
+    """
+    options = {'half': True, 'device': 0} if half else {}
+    return load_model(model_name).export(
+        format='onnx', imgsz=ONNX_IMAGE_SIZE, simplify=True, opset=17, **options
+    )
+
+@lru_cache(maxsize=None)
+def load_onnx_session(model_path: str):
+    """
+    Create an ONNX Runtime session and read the class names once per process.
+
+    Returns:
+        Tuple of (InferenceSession, {class_id: class_name})
+    """
+    import onnxruntime as ort
+
+    sess_options = ort.SessionOptions()
+    sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+    # Prefer a GPU (onnxruntime-gpu), then OpenVINO on Intel CPUs
+    # (onnxruntime-openvino), when installed
+    available = ort.get_available_providers()
+    providers = [
+        provider
+        for provider in ('CUDAExecutionProvider', 'OpenVINOExecutionProvider')
+        if provider in available
+    ] + ['CPUExecutionProvider']
+
+    session = ort.InferenceSession(model_path, sess_options, providers=providers)
+
+    # ultralytics stores names as a dict literal, e.g. "{0: 'person', ...}"
+    names = ast.literal_eval(session.get_modelmeta().custom_metadata_map['names'])
+
+    return session, names
+
+def letterbox(image: np.ndarray, size: int = ONNX_IMAGE_SIZE):
+    """
+    Resize keeping aspect ratio and pad to a size x size square.
+
+    Returns:
+        Tuple of (padded image, scale ratio, (pad_x, pad_y))
+    """
+    height, width = image.shape[:2]
+    ratio = min(size / height, size / width)
+    new_width, new_height = round(width * ratio), round(height * ratio)
+
+    if (new_width, new_height) != (width, height):
+        image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_LINEAR)
+
+    pad_x = (size - new_width) // 2
+    pad_y = (size - new_height) // 2
+    padded = cv2.copyMakeBorder(
+        image, pad_y, size - new_height - pad_y, pad_x, size - new_width - pad_x,
+        cv2.BORDER_CONSTANT, value=(114, 114, 114)
+    )
+
+    return padded, ratio, (pad_x, pad_y)
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """
+    Greedy NMS over xyxy boxes.
+
+    Returns:
+        Indices of the kept boxes, highest score first
+    """
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+
+    keep = []
+    while order.size > 0 and len(keep) < MAX_DETECTIONS:
+        best = order[0]
+        keep.append(best)
+
+        rest = order[1:]
+        inter_w = np.clip(np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest]), 0, None)
+        inter_h = np.clip(np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest]), 0, None)
+        intersection = inter_w * inter_h
+        iou = intersection / (areas[best] + areas[rest] - intersection + 1e-7)
+
+        order = rest[iou <= iou_threshold]
+
+    return np.array(keep, dtype=int)
+
+def detect_with_onnx(image: np.ndarray, model_path: str, confidence_threshold: float) -> list:
+    """Run an exported YOLOv8 ONNX model on a BGR image."""
+    session, names = load_onnx_session(model_path)
+    height, width = image.shape[:2]
+
+    model_input = session.get_inputs()[0]
+
+    # Letterbox, BGR -> RGB, HWC -> CHW, scale to [0, 1]
+    padded, ratio, (pad_x, pad_y) = letterbox(image)
+    blob = np.ascontiguousarray(padded[:, :, ::-1].transpose(2, 0, 1), dtype=np.float32)[None] / 255.0
+
+    # FP16 exports (export_onnx(half=True)) take a float16 input
+    if model_input.type == 'tensor(float16)':
+        blob = blob.astype(np.float16)
+
+    # Output (1, 4 + num_classes, num_anchors) -> one row per anchor.
+    # Scores and boxes are decoded in FP32 whatever the model precision.
+    output = session.run(None, {model_input.name: blob})[0]
+    predictions = output[0].T.astype(np.float32)
+
+    class_scores = predictions[:, 4:]
+    class_ids = class_scores.argmax(axis=1)
+    confidences = class_scores[np.arange(len(class_ids)), class_ids]
+
+    mask = confidences >= confidence_threshold
+    cx, cy, w, h = predictions[mask, :4].T
+    class_ids, confidences = class_ids[mask], confidences[mask]
+    boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+
+    # Per-class NMS in one pass: offset each class's boxes so that boxes
+    # of different classes never overlap
+    offsets = class_ids[:, None] * float(ONNX_IMAGE_SIZE * 2)
+    keep = non_max_suppression(boxes + offsets, confidences, NMS_IOU_THRESHOLD)
+
+    # Undo the letterbox and clip to the original image
+    boxes = (boxes[keep] - [pad_x, pad_y, pad_x, pad_y]) / ratio
+    boxes = boxes.clip(0, [width, height, width, height])
+
+    detections = []
+    for (x1, y1, x2, y2), class_id, confidence in zip(boxes, class_ids[keep], confidences[keep]):
+        detections.append({
+            'class': names[int(class_id)],
+            'confidence': float(confidence),
+            'bbox': {
+                'x': int(x1),
+                'y': int(y1),
+                'width': int(x2 - x1),
+                'height': int(y2 - y1)
+            }
+        })
+
+    return detections
+
+def detect_with_ultralytics(image_path: str, model_name: str, confidence_threshold: float) -> list:
+    """Run a YOLOv8 PyTorch model through ultralytics."""
+    # Load YOLO model (downloads on first run, cached afterwards)
+    model = load_model(model_name)
+
+    # Run inference (FP16 on CUDA GPUs only)
+    results = model(
+        image_path, conf=confidence_threshold, half=use_half_precision(), verbose=False
+    )
+
+    # Parse results
+    detections = []
+
+    for result in results:
+        boxes = result.boxes
+
+        # Copy each tensor to numpy once per image rather than indexing
+        # (and syncing) the device tensors once per detection
+        xyxy = boxes.xyxy.cpu().numpy()
+        class_ids = boxes.cls.cpu().numpy().astype(int)
+        confidences = boxes.conf.cpu().numpy().astype(float)
+
+        # Convert to xywh format
+        xs = xyxy[:, 0].astype(int)
+        ys = xyxy[:, 1].astype(int)
+        widths = (xyxy[:, 2] - xyxy[:, 0]).astype(int)
+        heights = (xyxy[:, 3] - xyxy[:, 1]).astype(int)
+
+        for x, y, width, height, class_id, confidence in zip(
+            xs.tolist(), ys.tolist(), widths.tolist(), heights.tolist(),
+            class_ids.tolist(), confidences.tolist()
+        ):
+            detections.append({
+                'class': model.names[class_id],
+                'confidence': confidence,
+                'bbox': {
+                    'x': x,
+                    'y': y,
+                    'width': width,
+                    'height': height
+                }
+            })
+
+    return detections
 
 def detect_objects(image_path: str, model_name: str = 'yolov8n.pt', confidence_threshold: float = 0.25):
     """
@@ -17,7 +254,7 @@ def detect_objects(image_path: str, model_name: str = 'yolov8n.pt', confidence_t
 
     Args:
         image_path: Path to image file
-        model_name: YOLO model to use (yolov8n/s/m/l/x)
+        model_name: YOLO model to use (yolov8n/s/m/l/x), or an exported .onnx file
         confidence_threshold: Minimum confidence for detections
 
     Returns:
@@ -29,43 +266,14 @@ def detect_objects(image_path: str, model_name: str = 'yolov8n.pt', confidence_t
         }
     """
     try:
-        # Load YOLO model (downloads on first run)
-        model = YOLO(model_name)
-
-        # Run inference
-        results = model(image_path, conf=confidence_threshold, verbose=False)
-
-        # Parse results
-        detections = []
-
-        for result in results:
-            boxes = result.boxes
-
-            for i in range(len(boxes)):
-                # Get bounding box (xyxy format)
-                x1, y1, x2, y2 = boxes.xyxy[i].tolist()
-
-                # Convert to xywh format
-                x = int(x1)
-                y = int(y1)
-                width = int(x2 - x1)
-                height = int(y2 - y1)
-
-                # Get class and confidence
-                class_id = int(boxes.cls[i])
-                confidence = float(boxes.conf[i])
-                class_name = model.names[class_id]
-
-                detections.append({
-                    'class': class_name,
-                    'confidence': confidence,
-                    'bbox': {
-                        'x': x,
-                        'y': y,
-                        'width': width,
-                        'height': height
-                    }
-                })
+        if model_name.endswith('.onnx'):
+            image = cv2.imread(image_path)
+            if image is None:
+                raise FileNotFoundError(image_path)
+
+            detections = detect_with_onnx(image, model_name, confidence_threshold)
+        else:
+            detections = detect_with_ultralytics(image_path, model_name, confidence_threshold)
 
         return {
             'success': True,
@@ -87,10 +295,16 @@ def detect_objects(image_path: str, model_name: str = 'yolov8n.pt', confidence_t
         }
 
 if __name__ == '__main__':
+    if len(sys.argv) in (3, 4) and sys.argv[1] == '--export':
+        half = len(sys.argv) == 4 and sys.argv[3] == '--half'
+        print(json.dumps({'success': True, 'model': export_onnx(sys.argv[2], half)}))
+        sys.exit(0)
+
     if len(sys.argv) < 2:
         print(json.dumps({
             'success': False,
-            'error': 'Usage: python3 detect_yolo.py <image_path> [model_name] [confidence]'
+            'error': 'Usage: python3 detect_yolo.py <image_path> [model_name] [confidence]\n'
+                     '       python3 detect_yolo.py --export <model_name> [--half]'
         }))
         sys.exit(1)
 
@@ -100,4 +314,3 @@ if __name__ == '__main__':
 
     result = detect_objects(image_path, model_name, confidence)
     print(json.dumps(result, indent=2))
-
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Persistent YOLOv8 Detection Server
+
+detect_yolo.py imports PyTorch and loads the model on every PHP call,
+which takes longer than the detection itself. This FastAPI server loads
+the model once at startup, so each request only runs inference.
+
+Usage:
+    python3 yolo_server.py [port]
+    # or
+    uvicorn yolo_server:app --host 127.0.0.1 --port 8765
+
+    Set YOLO_MODEL (default yolov8n.pt) to choose the model to preload.
+    It is the only model the server runs; requests naming another model
+    are rejected with HTTP 400.
+
+Request (POST /detect):
+    {"image_path": "/path/to/image.jpg", "confidence": 0.25}
+Response:
+    Same JSON as detect_yolo.py
+"""
+
+import os
+import sys
+import threading
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from detect_yolo import detect_objects, detect_with_onnx, load_model, use_half_precision
+
+DEFAULT_MODEL = os.environ.get('YOLO_MODEL', 'yolov8n.pt')
+DEFAULT_PORT = 8765
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the default model and run one dummy inference before serving."""
+    dummy_image = np.zeros((640, 640, 3), dtype=np.uint8)
+
+    if DEFAULT_MODEL.endswith('.onnx'):
+        detect_with_onnx(dummy_image, DEFAULT_MODEL, 0.25)
+    else:
+        # Same precision as detect_with_ultralytics(), so the warmup
+        # initialises the path requests will actually use
+        load_model(DEFAULT_MODEL)(dummy_image, half=use_half_precision(), verbose=False)
+    yield
+
+app = FastAPI(title='YOLOv8 Detection Server', lifespan=lifespan)
+
+# FastAPI runs sync endpoints on a thread pool; YOLO models are not safe
+# to call from several threads at once
+inference_lock = threading.Lock()
+
+class DetectRequest(BaseModel):
+    image_path: str
+    # Only the preloaded model is served: any other value would cold-load
+    # a new model (load_model() caches every one it sees) per request
+    model: Optional[str] = None
+    confidence: float = 0.25
+
+@app.get('/health')
+def health():
+    """Health check endpoint."""
+    return {'status': 'healthy', 'model': DEFAULT_MODEL}
+
+@app.post('/detect')
+def detect(request: DetectRequest):
+    """Detect objects in an image on the server's filesystem."""
+    if request.model not in (None, DEFAULT_MODEL):
+        raise HTTPException(
+            status_code=400,
+            detail=f"This server only runs {DEFAULT_MODEL} (set YOLO_MODEL to change it)"
+        )
+
+    with inference_lock:
+        return detect_objects(request.image_path, DEFAULT_MODEL, request.confidence)
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+
+    uvicorn.run(app, host='127.0.0.1', port=port)
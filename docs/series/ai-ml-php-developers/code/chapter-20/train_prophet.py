@@ -2,44 +2,99 @@
 """
 Facebook Prophet forecasting script callable from PHP.
 Reads sales data from JSON, trains Prophet model, outputs forecasts as JSON.
+
+Fitted models are cached on disk, keyed by a hash of the input data and
+model settings, so repeated calls with the same data skip fitting.
 """
 
 import sys
+import os
 import json
+import hashlib
+import tempfile
+from pathlib import Path
 from datetime import datetime
 from prophet import Prophet
+from prophet.serialize import model_to_json, model_from_json
 import pandas as pd
 
+CACHE_DIR = Path(tempfile.gettempdir()) / 'prophet_cache'
+
+PROPHET_PARAMS = {
+    'yearly_seasonality': True,
+    'weekly_seasonality': False,  # Not relevant for monthly data
+    'daily_seasonality': False,   # Not relevant for monthly data
+    'seasonality_mode': 'multiplicative',  # Better for % changes
+    'changepoint_prior_scale': 0.05,  # Control trend flexibility
+    # Simulations used for yhat_lower/yhat_upper (default 1000), which
+    # dominate predict() time. 100 gives slightly noisier bounds at a
+    # tenth of the cost; 0 skips them entirely, and the bounds then
+    # equal the forecast.
+    'uncertainty_samples': 100
+}
+
 def load_data_from_json(json_data):
     """Load and prepare data from JSON string."""
     data = json.loads(json_data)
     
-    # Prophet requires columns named 'ds' (date) and 'y' (value)
-    df = pd.DataFrame([
-        {
-            'ds': record['month'] + '-01',  # Add day for full date
-            'y': record['revenue']
-        }
-        for record in data
-    ])
+    # Prophet requires columns named 'ds' (date) and 'y' (value).
+    # Built column-wise, and the explicit format parses every month in one
+    # vectorized pass instead of guessing the format row by row.
+    months = [record['month'] for record in data]
+    revenue = [record['revenue'] for record in data]
     
-    df['ds'] = pd.to_datetime(df['ds'])
-    return df
+    return pd.DataFrame({
+        'ds': pd.to_datetime(months, format='%Y-%m'),
+        'y': revenue
+    })
 
-def train_and_forecast(df, periods=6, freq='M'):
-    """Train Prophet model and generate forecasts."""
+def cache_key(input_json):
+    """Hash the input data together with the model settings."""
+    payload = json.dumps(PROPHET_PARAMS, sort_keys=True) + input_json
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def fit_model(df, key=None):
+    """
+    Fit a Prophet model, or load it from the cache when key was seen before.
+    
+    Fitting takes seconds while forecasting takes milliseconds, so PHP
+    calls that repeat the same data only pay for the forecast.
+    """
+    cache_path = CACHE_DIR / f'{key}.json' if key else None
+    
+    if cache_path and cache_path.exists():
+        try:
+            with open(cache_path) as f:
+                return model_from_json(f.read())
+        except Exception:
+            pass  # Corrupt or unreadable entry: refit and overwrite it
+    
     # Initialize Prophet with yearly seasonality
-    model = Prophet(
-        yearly_seasonality=True,
-        weekly_seasonality=False,  # Not relevant for monthly data
-        daily_seasonality=False,   # Not relevant for monthly data
-        seasonality_mode='multiplicative',  # Better for % changes
-        changepoint_prior_scale=0.05  # Control trend flexibility
-    )
+    model = Prophet(**PROPHET_PARAMS)
     
     # Train the model
     model.fit(df)
     
+    if cache_path:
+        # Write to a temp file first so concurrent calls never read a
+        # half-written model
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(model_to_json(model))
+            os.replace(tmp_path, cache_path)
+        finally:
+            # Only still there if serializing or writing failed
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    return model
+
+def train_and_forecast(df, periods=6, freq='M', key=None):
+    """Train (or load a cached) Prophet model and generate forecasts."""
+    model = fit_model(df, key)
+    
     # Create future dataframe
     future = model.make_future_dataframe(periods=periods, freq=freq)
     
@@ -64,18 +119,21 @@ def main():
         df = load_data_from_json(input_json)
         
         # Train and forecast
-        forecast_df = train_and_forecast(df, periods=6, freq='MS')
+        forecast_df = train_and_forecast(df, periods=6, freq='MS', key=cache_key(input_json))
         
-        # Convert to JSON output
-        result = []
-        for _, row in forecast_df.iterrows():
-            result.append({
-                'month': row['ds'].strftime('%Y-%m'),
-                'forecast': float(row['yhat']),
-                'lower_bound': float(row['yhat_lower']),
-                'upper_bound': float(row['yhat_upper']),
-                'method': 'Prophet'
-            })
+        # Convert to JSON output (column-wise: one strftime call for all
+        # rows, and to_dict returns plain Python floats)
+        forecast_df = forecast_df.assign(
+            month=forecast_df['ds'].dt.strftime('%Y-%m'),
+            method='Prophet'
+        )
+        result = forecast_df[['month', 'yhat', 'yhat_lower', 'yhat_upper', 'method']].rename(
+            columns={
+                'yhat': 'forecast',
+                'yhat_lower': 'lower_bound',
+                'yhat_upper': 'upper_bound'
+            }
+        ).to_dict(orient='records')
         
         # Output JSON to stdout
         print(json.dumps({